@@ -0,0 +1,198 @@
+"""Achievement catalog and the engine that unlocks badges as a user's counters move.
+
+    python achievements.py evaluate
+
+The app unlocks badges from events as they happen; `evaluate` re-checks every rule for every
+user in one batch, for badges earned through imports or rules added since.
+"""
+import argparse
+from bisect import bisect_right
+from datetime import date
+
+import numpy as np
+
+from completions import count_perfect_days
+from locks import LockStripes
+
+# --- CATALOG ---
+# Each badge unlocks when one running counter reaches its threshold
+ACHIEVEMENTS = [
+    {"id": "first_step", "name": "First Step", "desc": "Complete your first habit", "icon": "🌱", "metric": "xp", "threshold": 11},
+    {"id": "week_warrior", "name": "Week Warrior", "desc": "7 Day Streak", "icon": "🔥", "metric": "total_streak", "threshold": 7},
+    {"id": "master_mind", "name": "Mastermind", "desc": "Reach Level 5", "icon": "🧠", "metric": "level", "threshold": 5},
+    {"id": "zen_master", "name": "Zen Master", "desc": "Log 3 Journal Entries", "icon": "🧘", "metric": "journal_count", "threshold": 3},
+    {"id": "perfectionist", "name": "Perfectionist", "desc": "100% Day Completion", "icon": "💎", "metric": "perfect_days", "threshold": 1},
+    {"id": "marathon", "name": "Marathon Runner", "desc": "30 Day Streak", "icon": "🏃", "metric": "total_streak", "threshold": 30},
+    {"id": "scholar", "name": "Scholar", "desc": "Complete 100 habits", "icon": "📚", "metric": "completions", "threshold": 100},
+    {"id": "elite", "name": "Elite", "desc": "Reach Level 10", "icon": "⭐", "metric": "level", "threshold": 10}
+]
+
+METRICS = ('xp', 'total_streak', 'level', 'journal_count', 'perfect_days', 'completions')
+ACHIEVEMENT_BITS = {a['id']: 1 << i for i, a in enumerate(ACHIEVEMENTS)}
+
+
+def _build_rules():
+    # Per metric: ascending thresholds and the bitmask of every badge reached at each of them,
+    # so one bisect finds everything a counter value has earned
+    rules = {}
+    for metric in METRICS:
+        ranked = sorted((a['threshold'], ACHIEVEMENT_BITS[a['id']]) for a in ACHIEVEMENTS if a['metric'] == metric)
+        masks, mask = [0], 0
+        for _, bit in ranked:
+            mask |= bit
+            masks.append(mask)
+        rules[metric] = ([t for t, _ in ranked], masks)
+    return rules
+
+
+RULES = _build_rules()
+
+
+def earned_mask(metric, value):
+    thresholds, masks = RULES[metric]
+    return masks[bisect_right(thresholds, value)]
+
+
+def ids_from_mask(mask):
+    return {a['id'] for a in ACHIEVEMENTS if mask & ACHIEVEMENT_BITS[a['id']]}
+
+
+def mask_from_ids(ids):
+    mask = 0
+    for achievement_id in ids:
+        mask |= ACHIEVEMENT_BITS.get(achievement_id, 0)
+    return mask
+
+
+# --- ENGINE ---
+class AchievementEngine:
+    """Keeps per-user running counters and an unlocked bitmask, loaded from storage once.
+
+    Events update the counters they touch and evaluate only those metrics' rules. Each event
+    runs under its user's lock stripe, so concurrent sessions of one user cannot lose counter
+    updates while other users proceed in parallel.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._users = {}
+        self._user_locks = LockStripes()
+
+    def _state(self, user_id):
+        state = self._users.get(user_id)
+        if state is None:
+            with self._user_locks(user_id):
+                state = self._users.get(user_id)
+                if state is None:
+                    state = self._users[user_id] = self._load(user_id)
+        return state
+
+    def _load(self, user_id):
+        user = self.storage.get_user(user_id)
+        bitmaps = [h['completions'] for h in self.storage.get_habits(user_id)]
+        today = date.today()
+        return {
+            'xp': user['xp'],
+            'total_streak': user['total_streak'],
+            'level': user['level'],
+            'journal_count': self.storage.journal_count(user_id),
+            'completions': sum(b.total() for b in bitmaps),
+            'perfect_days': count_perfect_days(bitmaps, today),
+            # The day the user last had every habit done, so a perfect yesterday is not undone after midnight
+            'perfect_on': today if bitmaps and all(today in b for b in bitmaps) else None,
+            'unlocked': mask_from_ids(self.storage.get_achievements(user_id)),
+            # The first event after loading checks every metric to catch up on older progress
+            'fresh': True
+        }
+
+    def forget(self, user_id):
+        with self._user_locks(user_id):
+            self._users.pop(user_id, None)
+
+    def unlocked(self, user_id):
+        return ids_from_mask(self._state(user_id)['unlocked'])
+
+    def _apply(self, user_id, changes):
+        state = self._state(user_id)
+        with self._user_locks(user_id):
+            state.update(changes)
+            metrics = METRICS if state.pop('fresh', False) else changes
+            earned = 0
+            for metric in metrics:
+                if metric in RULES:
+                    earned |= earned_mask(metric, state[metric])
+            new = earned & ~state['unlocked']
+            state['unlocked'] |= new
+        if not new:
+            return []
+        unlocked = [a for a in ACHIEVEMENTS if new & ACHIEVEMENT_BITS[a['id']]]
+        self.storage.unlock_achievements(user_id, [a['id'] for a in unlocked])
+        return unlocked
+
+    # Events
+    def on_habit_toggled(self, user_id, done, completed_today, total_habits, xp, total_streak=None):
+        with self._user_locks(user_id):
+            state = self._state(user_id)
+            changes = {'xp': xp, 'completions': max(0, state['completions'] + (1 if done else -1))}
+            if total_streak is not None:
+                changes['total_streak'] = total_streak
+            today = date.today()
+            perfect_now = total_habits > 0 and completed_today == total_habits
+            if perfect_now != (state['perfect_on'] == today):
+                changes['perfect_on'] = today if perfect_now else None
+                changes['perfect_days'] = state['perfect_days'] + (1 if perfect_now else -1)
+            return self._apply(user_id, changes)
+
+    def on_journal_saved(self, user_id, xp):
+        with self._user_locks(user_id):
+            state = self._state(user_id)
+            return self._apply(user_id, {'xp': xp, 'journal_count': state['journal_count'] + 1})
+
+    # Batch
+    def evaluate_all(self):
+        """Re-evaluate every rule for every user; returns {user_id: [new ids]}.
+
+        Counters come from a few whole-table queries and the rules are checked with array
+        operations across all users at once.
+        """
+        counters = self.storage.achievement_counters()
+        if counters.empty:
+            return {}
+        today = date.today()
+        bitmaps = self.storage.habit_bitmaps_by_user()
+        counters['perfect_days'] = [count_perfect_days(bitmaps.get(u, []), today) for u in counters['user_id']]
+        stored = self.storage.unlocked_by_user()
+        unlocked = np.array([mask_from_ids(stored.get(u, ())) for u in counters['user_id']], dtype=np.int64)
+        earned = np.zeros(len(counters), dtype=np.int64)
+        for achievement in ACHIEVEMENTS:
+            reached = counters[achievement['metric']].to_numpy() >= achievement['threshold']
+            earned |= np.where(reached, ACHIEVEMENT_BITS[achievement['id']], 0)
+        new = earned & ~unlocked
+        results = {
+            user_id: sorted(ids_from_mask(int(mask)))
+            for user_id, mask in zip(counters['user_id'], new) if mask
+        }
+        self.storage.unlock_many((user_id, a) for user_id, ids in results.items() for a in ids)
+        # Loaded counters may predate the batch; each user reloads on their next event
+        for user_id in list(self._users):
+            self.forget(user_id)
+        return results
+
+
+def main():
+    from storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Unlock every achievement users have earned but not been given.")
+    parser.add_argument('action', choices=('evaluate',))
+    parser.parse_args()
+
+    storage = open_storage()
+    try:
+        results = AchievementEngine(storage).evaluate_all()
+        print(f"unlocked {sum(len(ids) for ids in results.values())} achievements for {len(results)} users")
+    finally:
+        storage.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from completions import UNIX_EPOCH_ORDINAL, to_ordinal
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+# Weeks per block of the calendar heatmap: a year always fits, whatever weekday it starts on
+CALENDAR_WEEKS = 53
+
+
+# --- ANALYTICS SUMMARY ---
+def summarize(progress_data, habits):
+    """Every per-user statistic the tabs and the AI coach read, from one pass over the columns."""
+    day = progress_data['day_of_week'].to_numpy(dtype=np.int64)
+    rate = progress_data['completion_rate'].to_numpy(dtype=float)
+    mood = progress_data['mood'].to_numpy(dtype=float)
+
+    day_counts = np.bincount(day, minlength=7)[:7]
+    day_totals = np.bincount(day, weights=rate, minlength=7)[:7]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weekday_profile = day_totals / day_counts
+        weekend_avg = day_totals[5:].sum() / day_counts[5:].sum()
+        weekday_avg = day_totals[:5].sum() / day_counts[:5].sum()
+    has_days = day_counts > 0
+
+    with_mood = ~np.isnan(mood)
+    mood_correlation = float('nan')
+    if with_mood.sum() > 1 and mood[with_mood].std() > 0 and rate[with_mood].std() > 0:
+        mood_correlation = float(np.corrcoef(mood[with_mood], rate[with_mood])[0, 1])
+
+    streaks = np.array([h['streak'] for h in habits])
+    category_scores = {}
+    for habit in habits:
+        score = min(100, habit['total_completions'] * 2 + 20)
+        category_scores[habit['category']] = max(category_scores.get(habit['category'], 0), score)
+
+    return {
+        'weekday_profile': weekday_profile,
+        'best_day': int(np.nanargmax(weekday_profile)) if has_days.any() else None,
+        'worst_day': int(np.nanargmin(weekday_profile)) if has_days.any() else None,
+        'weekend_avg': float(weekend_avg),
+        'weekday_avg': float(weekday_avg),
+        'best_habit': habits[int(streaks.argmax())] if habits else None,
+        'weak_habit': habits[int(streaks.argmin())] if habits else None,
+        'mood_correlation': mood_correlation,
+        'category_scores': category_scores
+    }
+
+
+# --- CALENDAR HEATMAP ---
+def calendar_window(end, years):
+    """(first, last) day ordinals of the Monday-to-Sunday weeks a `years`-block calendar ending at `end` shows."""
+    end = to_ordinal(end)
+    # Ordinal 1 (0001-01-01) was a Monday
+    last = end + 6 - (end - 1) % 7
+    return last - CALENDAR_WEEKS * 7 * years + 1, last
+
+
+def calendar_grid(days, counts, end, years=1):
+    """Weekday x week grids of daily counts, one block of CALENDAR_WEEKS weeks per year, newest first.
+
+    `days` are the day ordinals with a non-zero count. Returns (z, dates), both shaped
+    (years, 7, CALENDAR_WEEKS); days after `end` are NaN in z.
+    """
+    first, last = calendar_window(end, years)
+    values = np.zeros(last - first + 1)
+    offsets = np.asarray(days, dtype=np.int64) - first
+    keep = (offsets >= 0) & (offsets < len(values))
+    values[offsets[keep]] = np.asarray(counts, dtype=float)[keep]
+    values[to_ordinal(end) - first + 1:] = np.nan
+    dates = np.arange(first - UNIX_EPOCH_ORDINAL, last - UNIX_EPOCH_ORDINAL + 1).astype('datetime64[D]')
+
+    # Consecutive days fill (block, week, weekday); newest block first, weekdays as rows
+    def blocks(a):
+        return a.reshape(years, CALENDAR_WEEKS, 7)[::-1].transpose(0, 2, 1)
+    return blocks(values), blocks(dates)
+
+
+# --- SUMMARY CACHE ---
+class SummaryCache:
+    """LRU of analytics summaries keyed by (user, data version)."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version, progress_data, habits):
+        key = (user_id, version)
+        with self._lock:
+            if key in self._summaries:
+                self._summaries.move_to_end(key)
+                return self._summaries[key]
+        summary = summarize(progress_data, habits)
+        with self._lock:
+            self._summaries[key] = summary
+            while len(self._summaries) > self.max_entries:
+                self._summaries.popitem(last=False)
+        return summary
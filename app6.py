@@ -1,14 +1,28 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
 import random
-import time
-import calendar
+import os
+import html
+import threading
+from storage import open_storage, MATCH_START, MATCH_END
+from model_cache import ModelCache, frame_version
+from completions import CompletionBitmap
+from synthetic import seed_user
+from leaderboard import LeaderboardIndex
+from charts import FigureCache
+from achievements import ACHIEVEMENTS, AchievementEngine
+from progress_store import ProgressStore
+from analytics import DAY_NAMES, SummaryCache, calendar_grid, calendar_window
+from profiling import start_profiler
+from transfer import DATASETS, import_file, iter_csv
+from sentiment import DEFAULT_SCORER, rescore_if_stale
+from ids import new_id
+import charts
+import predictor
+from training import TrainingQueue, TRAINING, FAILED, NO_DATA
+from population import PopulationModel
 
 # --- CONFIGURATION ---
 st.set_page_config(
@@ -116,29 +130,37 @@ st.markdown("""
         box-shadow: 0 0 20px rgba(255, 255, 255, 0.3);
     }
     
-    /* Tabs */
-    .stTabs [data-baseweb="tab-list"] {
+    /* Tabs (view selector radio styled as a tab bar) */
+    .st-key-active_view div[role="radiogroup"] {
         gap: 5px;
         background-color: rgba(0, 0, 0, 0.5);
         padding: 10px;
         border-radius: 15px;
     }
     
-    .stTabs [data-baseweb="tab"] {
+    .st-key-active_view div[role="radiogroup"] label {
         background-color: rgba(255, 255, 255, 0.05);
         border-radius: 10px;
         color: #ffffff;
         border: 1px solid rgba(255, 255, 255, 0.1);
         padding: 10px 20px;
+        margin: 0;
         font-weight: 600;
     }
     
-    .stTabs [aria-selected="true"] {
+    .st-key-active_view div[role="radiogroup"] label > div:first-child {
+        display: none;
+    }
+    
+    .st-key-active_view div[role="radiogroup"] label:has(input:checked) {
         background: linear-gradient(135deg, #ffffff, #cccccc);
-        color: #000000;
         border-color: #ffffff;
     }
     
+    .st-key-active_view div[role="radiogroup"] label:has(input:checked) p {
+        color: #000000;
+    }
+    
     /* Sidebar */
     section[data-testid="stSidebar"] {
         background: linear-gradient(180deg, #0a0a0a 0%, #1a1a1a 100%);
@@ -264,157 +286,250 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- DATABASE INITIALIZATION ---
+# One storage engine (and its connection pool) per server process, shared by every session.
+# Backend and location come from STRIDEX_STORAGE / STRIDEX_DB.
+@st.cache_resource
+def get_storage():
+    return open_storage()
+
+# XP ranking built once from storage, then kept current by storage's XP-change notifications
+@st.cache_resource
+def get_leaderboard():
+    storage = get_storage()
+    index = LeaderboardIndex(storage.xp_scores())
+    storage.subscribe_xp(index.update)
+    return index
+
+def leaderboard_page(start, count, current_uid):
+    entries = get_leaderboard().page(start, count)
+    users = get_storage().get_users(user_id for _, user_id, _ in entries)
+    return pd.DataFrame([
+        {
+            'Position': rank,
+            'Rank': '🥇' if rank == 1 else '🥈' if rank == 2 else '🥉' if rank == 3 else str(rank),
+            'Astronaut': users[user_id]['username'] + (' (YOU)' if user_id == current_uid else ''),
+            'Level': users[user_id]['level'],
+            'XP': xp,
+            'Streak': users[user_id]['total_streak'],
+            'is_current': user_id == current_uid
+        }
+        for rank, user_id, xp in entries if user_id in users
+    ], columns=['Position', 'Rank', 'Astronaut', 'Level', 'XP', 'Streak', 'is_current'])
+
+LEADERBOARD_PAGE_SIZE = 50
+
+def set_leaderboard_start(start):
+    st.session_state.leaderboard_start = max(0, start)
+
+def render_leaderboard_rows(df):
+    # One HTML payload for the whole page instead of one markdown element per row
+    rows = []
+    for row in df.itertuples(index=False):
+        rank_class = 'rank-1' if row.Position == 1 else 'rank-you' if row.is_current else ''
+        rows.append(
+            f'<div class="leaderboard-row {rank_class}">'
+            f'<span style="width: 10%; font-weight: 900;">{row.Rank}</span>'
+            f'<span style="width: 40%; font-weight: 600;">{html.escape(row.Astronaut)}</span>'
+            f'<span style="width: 15%; text-align: right;">Level {row.Level}</span>'
+            f'<span style="width: 20%; text-align: right;">{row.Streak} days 🔥</span>'
+            f'<span style="width: 15%; text-align: right; font-weight: 700;">{row.XP} XP</span>'
+            f'</div>'
+        )
+    return ''.join(rows)
+
+# Built figures are shared across sessions and reused until the data they plot changes
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+def cached_figure(owner, chart, version, build, *args):
+    with profiler.span(f"figure:{chart}"):
+        return get_figure_cache().get_or_build((owner, chart, version), build, *args)
+
+def show_figure(chart, fig):
+    # Separate span so figure building and element serialization show up apart
+    with profiler.span(f"render:{chart}"):
+        st.plotly_chart(fig, use_container_width=True)
+
+# --- ACTIVITY CALENDAR ---
+CALENDAR_YEARS = [1, 2, 3, 4, 5]
+
+def calendar_figure(uid, habit, years, today):
+    # All habits read the maintained per-day counts; a single habit reads its own bitmap
+    first, _ = calendar_window(today, years)
+    if habit is None:
+        days, counts = get_storage().daily_completions(uid, datetime.fromordinal(first).date().isoformat(), today)
+        unit = 'habits completed'
+    else:
+        bitmap = habit['completions']
+        days = np.flatnonzero(bitmap.to_array(today)[max(first - bitmap.epoch, 0):]) + max(first, bitmap.epoch)
+        counts = np.ones(len(days))
+        unit = 'completed'
+    z, dates = calendar_grid(days, counts, today, years)
+    return charts.calendar_heatmap(z, dates, unit)
+
+# Columnar per-user progress history, loaded once and appended in place
+@st.cache_resource
+def get_progress_store():
+    return ProgressStore(get_storage())
+
+# Per-user statistics shared by the Analytics, AI Insights and coach code paths
+@st.cache_resource
+def get_summary_cache():
+    return SummaryCache()
+
+# Journal sentiment scorer; stored labels are redone once per process if the lexicon changed, on a
+# background thread so the first page load doesn't wait on a pass over every journal entry
+@st.cache_resource
+def get_sentiment_scorer():
+    threading.Thread(
+        target=rescore_if_stale, args=(get_storage(), DEFAULT_SCORER), name='stridex-rescore', daemon=True
+    ).start()
+    return DEFAULT_SCORER
+
 def init_db():
-    if 'users_db' not in st.session_state:
-        st.session_state.users_db = {}
-    if 'habits_db' not in st.session_state:
-        st.session_state.habits_db = {}
-    if 'progress_db' not in st.session_state:
-        st.session_state.progress_db = {}
-    if 'journal_db' not in st.session_state:
-        st.session_state.journal_db = {}
-    if 'achievements_db' not in st.session_state:
-        st.session_state.achievements_db = {}
     if 'chat_messages' not in st.session_state:
         st.session_state.chat_messages = []
+    get_leaderboard()
+    get_sentiment_scorer()
+    return get_storage()
 
 # --- ACHIEVEMENTS SYSTEM ---
-def get_achievements_list():
-    return [
-        {"id": "first_step", "name": "First Step", "desc": "Complete your first habit", "icon": "🌱"},
-        {"id": "week_warrior", "name": "Week Warrior", "desc": "7 Day Streak", "icon": "🔥"},
-        {"id": "master_mind", "name": "Mastermind", "desc": "Reach Level 5", "icon": "🧠"},
-        {"id": "zen_master", "name": "Zen Master", "desc": "Log 3 Journal Entries", "icon": "🧘"},
-        {"id": "perfectionist", "name": "Perfectionist", "desc": "100% Day Completion", "icon": "💎"},
-        {"id": "marathon", "name": "Marathon Runner", "desc": "30 Day Streak", "icon": "🏃"},
-        {"id": "scholar", "name": "Scholar", "desc": "Complete 100 habits", "icon": "📚"},
-        {"id": "elite", "name": "Elite", "desc": "Reach Level 10", "icon": "⭐"}
-    ]
+# Running counters per user, shared across sessions; each event evaluates only the rules it touches
+@st.cache_resource
+def get_achievement_engine():
+    return AchievementEngine(get_storage())
 
-def check_achievements(user_id):
-    user = st.session_state.users_db[user_id]
-    habits = st.session_state.habits_db[user_id]
-    
-    journal_count = len(st.session_state.journal_db.get(user_id, []))
-    total_completions = sum(h['total_completions'] for h in habits)
-    
-    # Check for perfect day
-    completed_today = sum(1 for h in habits if datetime.now().date().isoformat() in h['completed_dates'])
-    perfect_days = 1 if completed_today == len(habits) and len(habits) > 0 else 0
-    
-    unlocked = st.session_state.achievements_db.get(user_id, [])
-    new_unlocks = []
-    
-    achievements = get_achievements_list()
-    
-    # Check conditions
-    conditions = {
-        "first_step": user['xp'] > 10,
-        "week_warrior": user['total_streak'] >= 7,
-        "master_mind": user['level'] >= 5,
-        "zen_master": journal_count >= 3,
-        "perfectionist": perfect_days >= 1,
-        "marathon": user['total_streak'] >= 30,
-        "scholar": total_completions >= 100,
-        "elite": user['level'] >= 10
-    }
-    
-    for ach in achievements:
-        if ach['id'] not in unlocked and conditions.get(ach['id'], False):
-            unlocked.append(ach['id'])
-            new_unlocks.append(ach)
-    
-    st.session_state.achievements_db[user_id] = unlocked
-    return new_unlocks
+# --- JOURNAL ARCHIVE ---
+JOURNAL_PAGE_SIZE = 5
+
+def reset_journal_pages():
+    st.session_state.journal_offset = 0
+    st.session_state.journal_cursors = []
+
+def set_journal_offset(offset):
+    st.session_state.journal_offset = max(0, offset)
+
+def older_journal_page(last_entry):
+    st.session_state.journal_cursors.append((last_entry['date'], last_entry['id']))
+
+def newer_journal_page():
+    st.session_state.journal_cursors.pop()
+
+def render_journal_entry(entry):
+    entry_date = datetime.fromisoformat(entry['date']).strftime('%b %d, %Y')
+    if entry.get('snippet'):
+        # Escape first, then turn snippet()'s match markers into highlights
+        excerpt = html.escape(entry['snippet']).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+    else:
+        excerpt = html.escape(entry['text'][:80]) + '...'
+    st.markdown(f"""
+    <div style="background: rgba(255,255,255,0.05); padding: 15px; border-radius: 10px; margin-bottom: 10px; border-left: 3px solid #ffffff;">
+        <small style="color: #888">{entry_date}</small><br>
+        <i style="color: #ddd">"{excerpt}"</i><br>
+        <small style="color: #aaa">Sentiment: {entry.get('sentiment') or 'N/A'}</small>
+    </div>
+    """, unsafe_allow_html=True)
 
 # --- USER CREATION ---
-def create_user(username, habit_list):
-    user_id = datetime.now().strftime('%Y%m%d%H%M%S')
-    
-    categories = ['Health', 'Intellect', 'Spirit', 'Career', 'Creativity']
-    
-    habits = []
-    for i, h_name in enumerate(habit_list):
-        if h_name.strip():
-            habits.append({
-                'id': f"{user_id}_{i}",
-                'name': h_name.strip(),
-                'emoji': random.choice(['💪', '📚', '🧘', '💻', '🎯', '🏃', '🎨', '🔥']),
-                'category': random.choice(categories),
-                'streak': 0,
-                'level': 1,
-                'total_completions': 0,
-                'completed_dates': []
-            })
+def create_user(username, habit_list, days=60, seed=None):
+    # Time-sortable and unique even for many signups in the same second
+    user_id = new_id()
     
-    # Generate synthetic historical data (60 days)
-    history = []
-    dates = pd.date_range(end=datetime.now(), periods=60, freq='D')
+    habit_names = [h.strip() for h in habit_list if h.strip()]
     
-    total_xp = 0
-    current_streak = 0
-    
-    for date in dates:
-        is_weekend = date.weekday() >= 5
-        base_rate = 0.75 if not is_weekend else 0.6
-        completed_count = 0
-        
-        for h in habits:
-            if random.random() < base_rate:
-                completed_count += 1
-                if date.date() != datetime.now().date():
-                    h['total_completions'] += 1
-                    h['completed_dates'].append(date.date().isoformat())
-                    h['streak'] = min(h['streak'] + 1, 100)
-        
-        xp = completed_count * 15
-        total_xp += xp
-        
-        if completed_count == len(habits):
-            current_streak += 1
-        elif completed_count < len(habits) / 2:
-            current_streak = max(0, current_streak - 1)
-        
-        history.append({
-            'date': date,
-            'completion_rate': (completed_count / len(habits)) * 100,
-            'habits_completed': completed_count,
-            'total_habits': len(habits),
-            'xp_earned': xp,
-            'mood': random.randint(5, 10),
-            'motivation': random.randint(4, 9),
-            'focus_minutes': random.randint(30, 180),
-            'day_of_week': date.weekday(),
-            'week_number': date.isocalendar()[1]
-        })
-    
-    st.session_state.users_db[user_id] = {
-        'id': user_id,
-        'username': username,
-        'level': int(total_xp / 500) + 1,
-        'xp': total_xp,
-        'total_streak': current_streak,
-        'rank': 'Commander'
-    }
-    st.session_state.habits_db[user_id] = habits
-    st.session_state.progress_db[user_id] = history
-    st.session_state.achievements_db[user_id] = []
-    st.session_state.journal_db[user_id] = []
-    
-    return user_id
+    # Synthetic history (60 days by default); user, habits and history land in one transaction
+    return seed_user(get_storage(), user_id, username, habit_names, days=days, seed=seed)
 
 # --- ML MODEL ---
-def train_habit_predictor(df):
-    if len(df) < 10:
-        return None
-    
-    X = df[['day_of_week', 'mood', 'motivation', 'habits_completed']].fillna(0)
-    y = (df['completion_rate'] >= 80).astype(int)
+PREDICTOR_FEATURES = predictor.FEATURES
+PREDICTOR_COLUMNS = predictor.COLUMNS
+
+# Fitted models are shared across sessions and reused until the user's training data changes.
+# Memory cap (MB) and on-disk location come from STRIDEX_MODEL_CACHE_MB / STRIDEX_MODEL_CACHE_DIR.
+@st.cache_resource
+def get_model_cache():
+    return ModelCache(
+        max_bytes=int(os.environ.get('STRIDEX_MODEL_CACHE_MB', 256)) * 1024 * 1024,
+        cache_dir=os.environ.get('STRIDEX_MODEL_CACHE_DIR', '.model_cache')
+    )
+
+# Models train on background workers so a fit never blocks a rerun. STRIDEX_TRAINING_WORKERS caps
+# concurrent fits, and the cores are split between them so training leaves room for UI threads.
+@st.cache_resource
+def get_training_queue():
+    workers = max(1, int(os.environ.get('STRIDEX_TRAINING_WORKERS', 2)))
+    n_jobs = max(1, (os.cpu_count() or 1) // workers)
+    return TrainingQueue(
+        get_model_cache(), lambda df, previous: predictor.train(df, previous, n_jobs=n_jobs), max_workers=workers
+    )
+
+def get_habit_predictor(user_id, training_rows):
+    # (model, its data version, status); the model may be the last good one while a newer one trains.
+    # Versions hash predictor.training_rows only, so caught-up days without a check-in don't force a refit.
+    if len(training_rows) < predictor.MIN_DAYS:
+        return None, None, NO_DATA
+    return get_training_queue().request(user_id, training_rows, PREDICTOR_COLUMNS)
+
+# One forest over every user's history, shared by all sessions and retrained in the background
+# every STRIDEX_POPULATION_MODEL_HOURS; STRIDEX_POPULATION_WORKERS caps its training processes.
+@st.cache_resource
+def get_population_model():
+    workers = os.environ.get('STRIDEX_POPULATION_WORKERS')
+    return PopulationModel(
+        get_storage(),
+        path=os.path.join(get_model_cache().cache_dir, 'population.joblib') if get_model_cache().cache_dir else None,
+        max_age=float(os.environ.get('STRIDEX_POPULATION_MODEL_HOURS', 6)) * 3600,
+        workers=int(workers) if workers else None
+    )
+
+@st.fragment(run_every=2)
+def training_status(user_id, version, has_model):
+    # Polls the queue and reruns the whole script once the new model is in the cache
+    if get_training_queue().status(user_id, version) != TRAINING:
+        rerun()
+    if has_model:
+        st.info("⏳ Retraining on your latest data… showing your previous model until it's ready.")
+    else:
+        st.info("⏳ Training your prediction model… this takes a few seconds.")
+
+def predict_success(model, X):
+    # Probability of an 80%+ day for every row of X, in one predict_proba call
+    classes = list(model.classes_)
+    if 1 not in classes:
+        return np.zeros(len(X))
+    return model.predict_proba(pd.DataFrame(X, columns=PREDICTOR_FEATURES))[:, classes.index(1)] * 100
+
+def forecast_success(model, df, days=7):
+    start = datetime.now()
+    future_dates = [start + timedelta(days=i) for i in range(days)]
+    averages = df[['mood', 'motivation', 'habits_completed']].mean().to_numpy()
     
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
-    model.fit(X, y)
+    X = np.empty((days, len(PREDICTOR_FEATURES)))
+    X[:, 0] = [d.weekday() for d in future_dates]
+    X[:, 1:] = averages
     
-    return model
+    return pd.DataFrame({
+        'Date': [d.strftime('%a, %b %d') for d in future_dates],
+        'Success Probability': predict_success(model, X)
+    })
+
+def what_if_grid(model, habits_completed):
+    # Scores every day-of-week x mood x motivation combination (7 x 10 x 10) in one batch
+    day, mood, motivation = np.meshgrid(np.arange(7), np.arange(1, 11), np.arange(1, 11), indexing='ij')
+    X = np.column_stack([
+        day.ravel(), mood.ravel(), motivation.ravel(),
+        np.full(day.size, habits_completed)
+    ])
+    return predict_success(model, X).reshape(7, 10, 10)
+
+def cached_what_if_grid(uid, model_version, model, habits_completed):
+    # The 700-row predict_proba is the expensive part; it is kept in the figure cache's LRU next to
+    # the figures, so moving the day, mood or motivation sliders only rebuilds the heatmap
+    with profiler.span('what_if_grid'):
+        return get_figure_cache().get_or_build(
+            (uid, 'what_if_grid', (model_version, habits_completed)), what_if_grid, model, habits_completed
+        )
 
 # --- MOTIVATIONAL MESSAGES ---
 def generate_motivation(completion_rate, streak, level):
@@ -440,7 +555,16 @@ def generate_motivation(completion_rate, streak, level):
     return random.choice(messages)
 
 # --- INITIALIZE ---
-init_db()
+# Timing spans are collected only with STRIDEX_PROFILE or ?profile= set; otherwise profiler is a no-op
+profiler = start_profiler(st.query_params.get('profile'))
+
+def rerun():
+    # st.rerun() ends the run by raising, so stop the profiler first or its cProfile hook stays on
+    profiler.stop()
+    st.rerun()
+
+with profiler.span('init_db'):
+    db = init_db()
 
 if 'user_id' not in st.session_state:
     st.session_state.user_id = None
@@ -470,17 +594,27 @@ if st.session_state.page == 'landing':
                 uid = create_user(username_input, habit_list)
                 st.session_state.user_id = uid
                 st.session_state.page = 'dashboard'
-                st.rerun()
+                rerun()
 
 # --- DASHBOARD ---
 elif st.session_state.page == 'dashboard':
     uid = st.session_state.user_id
-    user = st.session_state.users_db[uid]
-    habits = st.session_state.habits_db[uid]
-    progress_data = pd.DataFrame(st.session_state.progress_db[uid])
+    profiler.begin('load_user')
+    user = db.get_user(uid)
+    habits = db.get_habits(uid)
+    today = datetime.now().date().isoformat()
+    progress = get_progress_store()
+    if progress.catch_up(uid, habits, today):
+        user = db.get_user(uid)
+    progress_data = progress.frame(uid)
+    summary = get_summary_cache().get(uid, user['version'], progress_data, habits)
+    completed_ids = {h['id'] for h in habits if today in h['completions']}
+    completed_today = len(completed_ids)
+    completion_rate_today = (completed_today / len(habits)) * 100 if habits else 0
+    profiler.end()
     
     # SIDEBAR
-    with st.sidebar:
+    with st.sidebar, profiler.span('sidebar'):
         st.markdown(f"### 👨‍🚀 {user['username']}")
         st.markdown(f"**Rank:** {user['rank']}")
         st.markdown(f"**Level:** {user['level']}")
@@ -502,40 +636,73 @@ elif st.session_state.page == 'dashboard':
         st.markdown("---")
         
         st.markdown("### 📊 Quick Stats")
-        avg_completion = progress_data['completion_rate'].tail(7).mean()
+        avg_completion = progress.columns(uid).rolling_mean(7)
         st.metric("7-Day Avg", f"{avg_completion:.1f}%")
         st.metric("Total Habits", len(habits))
         st.metric("Longest Streak", f"{user['total_streak']} days")
         
         st.markdown("---")
         
+        # Bulk import streams the file into storage chunk by chunk; export is generated only on click
+        with st.expander("📦 Import / Export"):
+            dataset = st.selectbox("Dataset", list(DATASETS), key="transfer_dataset")
+            report = st.session_state.pop('transfer_report', None)
+            if report:
+                st.success(f"Imported {report['imported']:,} of {report['rows']:,} rows")
+                for reason, count in report['problems'].items():
+                    st.caption(f"Skipped {count:,}: {reason}")
+            upload = st.file_uploader("CSV or Parquet", type=['csv', 'parquet'], key="transfer_upload")
+            if upload is not None and st.button("📥 Import", use_container_width=True):
+                try:
+                    st.session_state.transfer_report = import_file(db, dataset, upload, user_id=uid)
+                except (ValueError, ImportError) as e:
+                    st.error(str(e))
+                else:
+                    progress.forget(uid)
+                    get_achievement_engine().forget(uid)
+                    rerun()
+            # Streamlit holds a download's whole payload in memory (even a deferred one), so this is
+            # built on click and kept to one user's rows; transfer.py's CLI export streams to disk
+            st.download_button(
+                "📤 Export CSV",
+                lambda: ''.join(iter_csv(db, dataset, user_id=uid)),
+                file_name=f"stridex-{dataset}.csv",
+                mime="text/csv",
+                on_click='ignore',
+                use_container_width=True,
+                help="Built in memory when clicked. For large exports, `python transfer.py export` "
+                     "streams to a CSV or Parquet file instead."
+            )
+        
+        st.markdown("---")
+        
         if st.button("🚪 Logout"):
             st.session_state.user_id = None
             st.session_state.page = 'landing'
-            st.rerun()
+            rerun()
     
     # MAIN HEADER
     st.markdown(f'<h1 class="hero-title" style="font-size: 80px;">STRIDEX</h1>', unsafe_allow_html=True)
     st.markdown(f'<p class="hero-subtitle">Mission Control - {user["username"]}</p>', unsafe_allow_html=True)
     
     # TABS
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+    # Only the selected view's code runs on a rerun; st.tabs would execute all six bodies
+    VIEWS = [
         "🎯 Command Center",
         "📊 Analytics Lab",
         "🏆 Leaderboard",
         "🤖 AI Insights",
         "📈 Predictions",
         "🧘 Journal & Zen"
-    ])
+    ]
+    active_view = st.radio("View", VIEWS, horizontal=True, key="active_view", label_visibility="collapsed")
+    profiler.begin(f"view:{active_view}")
     
     # TAB 1: COMMAND CENTER
-    with tab1:
+    if active_view == VIEWS[0]:
         st.markdown("## 🌌 Your Habit Constellation")
         
         # Key Metrics
-        completed_today = sum(1 for h in habits if datetime.now().date().isoformat() in h['completed_dates'])
-        completion_rate_today = (completed_today / len(habits)) * 100 if habits else 0
-        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
@@ -561,7 +728,7 @@ elif st.session_state.page == 'dashboard':
         cols = st.columns(2)
         for idx, habit in enumerate(habits):
             with cols[idx % 2]:
-                is_completed = datetime.now().date().isoformat() in habit['completed_dates']
+                is_completed = habit['id'] in completed_ids
                 
                 col_a, col_b = st.columns([3, 1])
                 with col_a:
@@ -570,27 +737,42 @@ elif st.session_state.page == 'dashboard':
                         value=is_completed,
                         key=f"habit_check_{habit['id']}"
                     ):
-                        if not is_completed:
-                            habit['completed_dates'].append(datetime.now().date().isoformat())
+                        # set_completion is False when another session already made this change
+                        streaks = not is_completed and db.set_completion(uid, habit['id'], today, True)
+                        if streaks:
+                            completed_ids.add(habit['id'])
+                            habit['completions'].add(today)
                             habit['total_completions'] += 1
-                            habit['streak'] += 1
+                            habit.update(streak=streaks['streak'], longest_streak=streaks['longest_streak'])
+                            user['total_streak'] = streaks['total_streak']
                             user['xp'] += 15
                             
                             # Check achievements
-                            new_badges = check_achievements(uid)
+                            with profiler.span('achievements'):
+                                new_badges = get_achievement_engine().on_habit_toggled(
+                                    uid, True, len(completed_ids), len(habits), user['xp'], user['total_streak']
+                                )
                             if new_badges:
                                 st.balloons()
                                 for badge in new_badges:
                                     st.success(f"🏆 Achievement Unlocked: {badge['name']}!")
                     else:
-                        if is_completed:
-                            habit['completed_dates'].remove(datetime.now().date().isoformat())
+                        streaks = is_completed and db.set_completion(uid, habit['id'], today, False)
+                        if streaks:
+                            completed_ids.discard(habit['id'])
+                            habit['completions'].discard(today)
                             habit['total_completions'] = max(0, habit['total_completions'] - 1)
+                            habit.update(streak=streaks['streak'], longest_streak=streaks['longest_streak'])
+                            user['total_streak'] = streaks['total_streak']
                             user['xp'] = max(0, user['xp'] - 15)
+                            with profiler.span('achievements'):
+                                get_achievement_engine().on_habit_toggled(
+                                    uid, False, len(completed_ids), len(habits), user['xp'], user['total_streak']
+                                )
                 
                 with col_b:
                     st.markdown(f"**🔥 {habit['streak']}**")
-                    st.caption(f"Level {habit['level']}")
+                    st.caption(f"Best {habit['longest_streak']} • Level {habit['level']}")
         
         st.markdown("---")
         
@@ -603,49 +785,50 @@ elif st.session_state.page == 'dashboard':
             st.markdown("<br>", unsafe_allow_html=True)
             if st.button("Add Habit"):
                 if new_habit_name.strip():
-                    habits.append({
-                        'id': f"{uid}_{len(habits)}",
+                    db.add_habit(uid, {
+                        'id': new_id(),
                         'name': new_habit_name.strip(),
                         'emoji': random.choice(['💪', '📚', '🧘', '💻', '🎯']),
                         'category': random.choice(['Health', 'Intellect', 'Spirit', 'Career', 'Creativity']),
                         'streak': 0,
                         'level': 1,
                         'total_completions': 0,
-                        'completed_dates': []
+                        'completions': CompletionBitmap(datetime.now())
                     })
                     st.success(f"Added: {new_habit_name}")
-                    st.rerun()
+                    rerun()
     
     # TAB 2: ANALYTICS LAB
-    with tab2:
+    if active_view == VIEWS[1]:
         st.markdown("## 📊 Analytics Observatory")
         
         # Completion Rate Over Time
         st.markdown("### 🌠 Mission Success Trajectory")
         
-        fig_line = go.Figure()
-        fig_line.add_trace(go.Scatter(
-            x=progress_data['date'],
-            y=progress_data['completion_rate'],
-            mode='lines+markers',
-            name='Completion Rate',
-            line=dict(color='#ffffff', width=3),
-            fill='tozeroy',
-            fillcolor='rgba(255, 255, 255, 0.2)'
-        ))
-        
-        fig_line.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='rgba(0, 0, 0, 0)',
-            plot_bgcolor='rgba(26, 29, 62, 0.5)',
-            height=400,
-            xaxis_title="Date",
-            yaxis_title="Completion Rate (%)",
-            hovermode='x unified',
-            font=dict(color='white')
-        )
+        fig_line = cached_figure(uid, 'trend', (user['version'], today, completed_today), charts.completion_trend,
+                                 progress_data, today, completion_rate_today)
         
-        st.plotly_chart(fig_line, use_container_width=True)
+        show_figure('trend', fig_line)
+        
+        # Activity Calendar
+        st.markdown("### 🗓️ Activity Calendar")
+        
+        col_scope, col_years = st.columns([3, 1])
+        with col_scope:
+            calendar_scope = st.selectbox(
+                "Habits", range(len(habits) + 1), key="calendar_scope",
+                format_func=lambda i: "All habits" if i == 0 else f"{habits[i - 1]['emoji']} {habits[i - 1]['name']}"
+            )
+        with col_years:
+            calendar_years = st.select_slider("Years", CALENDAR_YEARS, key="calendar_years")
+        calendar_habit = habits[calendar_scope - 1] if calendar_scope else None
+        
+        # Rebuilt only when the user's data, the day, or the selection changes
+        calendar_version = (user['version'], today, calendar_habit and calendar_habit['id'], calendar_years)
+        fig_calendar = cached_figure(uid, 'calendar', calendar_version, calendar_figure,
+                                     uid, calendar_habit, calendar_years, today)
+        
+        show_figure('calendar', fig_calendar)
         
         # Two Column Charts
         col1, col2 = st.columns(2)
@@ -653,127 +836,59 @@ elif st.session_state.page == 'dashboard':
         with col1:
             st.markdown("### 📅 Weekly Performance Radar")
             
-            weekly_data = progress_data.groupby('day_of_week')['completion_rate'].mean()
-            days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-            
-            fig_radar = go.Figure()
-            fig_radar.add_trace(go.Scatterpolar(
-                r=weekly_data.values,
-                theta=days,
-                fill='toself',
-                fillcolor='rgba(255, 255, 255, 0.2)',
-                line=dict(color='#ffffff', width=2)
-            ))
+            fig_radar = cached_figure(uid, 'weekly_radar', user['version'], charts.weekly_radar, summary['weekday_profile'])
             
-            fig_radar.update_layout(
-                template='plotly_dark',
-                paper_bgcolor='rgba(0, 0, 0, 0)',
-                plot_bgcolor='rgba(26, 29, 62, 0.5)',
-                polar=dict(
-                    radialaxis=dict(range=[0, 100], showticklabels=True),
-                    bgcolor='rgba(10, 14, 39, 0.5)'
-                ),
-                height=400,
-                font=dict(color='white')
-            )
-            
-            st.plotly_chart(fig_radar, use_container_width=True)
+            show_figure('weekly_radar', fig_radar)
         
         with col2:
             st.markdown("### 💪 Habit Strength Analysis")
             
-            habit_names = [h['name'] for h in habits]
-            strengths = [h['streak'] * 3.5 for h in habits]
-            
-            fig_bar = go.Figure()
-            fig_bar.add_trace(go.Bar(
-                y=habit_names,
-                x=strengths,
-                orientation='h',
-                marker=dict(
-                    color=strengths,
-                    colorscale='Greys',
-                    showscale=True
-                )
-            ))
-            
-            fig_bar.update_layout(
-                template='plotly_dark',
-                paper_bgcolor='rgba(0, 0, 0, 0)',
-                plot_bgcolor='rgba(26, 29, 62, 0.5)',
-                xaxis_title="Strength Score",
-                height=400,
-                font=dict(color='white')
-            )
+            fig_bar = cached_figure(uid, 'habit_strength', user['version'], charts.habit_strength, habits)
             
-            st.plotly_chart(fig_bar, use_container_width=True)
+            show_figure('habit_strength', fig_bar)
         
         # Category Balance
         st.markdown("### 🎯 Skill Balance Radar")
         
-        category_scores = {}
-        for habit in habits:
-            cat = habit['category']
-            score = min(100, habit['total_completions'] * 2 + 20)
-            category_scores[cat] = max(category_scores.get(cat, 0), score)
-        
-        fig_cat_radar = go.Figure()
-        fig_cat_radar.add_trace(go.Scatterpolar(
-            r=list(category_scores.values()),
-            theta=list(category_scores.keys()),
-            fill='toself',
-            fillcolor='rgba(255, 255, 255, 0.2)',
-            line=dict(color='#ffffff', width=2)
-        ))
-        
-        fig_cat_radar.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='rgba(0, 0, 0, 0)',
-            plot_bgcolor='rgba(26, 29, 62, 0.5)',
-            polar=dict(
-                radialaxis=dict(range=[0, 100]),
-                bgcolor='rgba(10, 14, 39, 0.5)'
-            ),
-            height=400,
-            font=dict(color='white')
-        )
+        fig_cat_radar = cached_figure(uid, 'category_radar', user['version'], charts.category_radar, summary['category_scores'])
         
-        st.plotly_chart(fig_cat_radar, use_container_width=True)
+        show_figure('category_radar', fig_cat_radar)
     
     # TAB 3: LEADERBOARD
-    with tab3:
+    if active_view == VIEWS[2]:
         st.markdown("## 🏆 Global Leaderboard")
         
-        # Generate leaderboard from all users
-        all_users = list(st.session_state.users_db.values())
-        leaderboard_data = sorted(all_users, key=lambda x: x['xp'], reverse=True)
-        
-        # Create dataframe
-        leaderboard_df = pd.DataFrame([
-            {
-                'Rank': '🥇' if i == 0 else '🥈' if i == 1 else '🥉' if i == 2 else str(i + 1),
-                'Astronaut': u['username'] + (' (YOU)' if u['id'] == uid else ''),
-                'Level': u['level'],
-                'XP': u['xp'],
-                'Streak': u['total_streak'],
-                'is_current': u['id'] == uid
-            }
-            for i, u in enumerate(leaderboard_data)
-        ])
+        # Read one page of the maintained ranking instead of sorting every user
+        leaderboard_index = get_leaderboard()
+        total_ranked = len(leaderboard_index)
+        my_rank = leaderboard_index.rank(uid)
+        
+        if 'leaderboard_start' not in st.session_state:
+            st.session_state.leaderboard_start = 0
+        
+        page_start = min(st.session_state.leaderboard_start, max(0, total_ranked - 1))
+        
+        # Callbacks run before the script, so the page below already reflects the click
+        col_prev, col_me, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button("◀ Previous", disabled=page_start == 0, on_click=set_leaderboard_start,
+                      args=(page_start - LEADERBOARD_PAGE_SIZE,))
+        with col_me:
+            st.button("📍 Jump to My Rank", use_container_width=True, on_click=set_leaderboard_start,
+                      args=(my_rank - 1 - LEADERBOARD_PAGE_SIZE // 2,))
+        with col_next:
+            st.button("Next ▶", disabled=page_start + LEADERBOARD_PAGE_SIZE >= total_ranked,
+                      on_click=set_leaderboard_start, args=(page_start + LEADERBOARD_PAGE_SIZE,))
+        
+        leaderboard_df = leaderboard_page(page_start, LEADERBOARD_PAGE_SIZE, uid)
+        
+        st.caption(
+            f"Ranks {page_start + 1}–{page_start + len(leaderboard_df)} of {total_ranked:,} astronauts • "
+            f"Your rank: #{my_rank}"
+        )
         
         # Display with custom styling
-        for idx, row in leaderboard_df.iterrows():
-            rank_class = 'rank-1' if idx == 0 else 'rank-you' if row['is_current'] else ''
-            
-            st.markdown(f"""
-            <div class="leaderboard-row {rank_class}">
-                <span style="width: 10%; font-weight: 900;">{row['Rank']}</span>
-                <span style="width: 40%; font-weight: 600;">{row['Astronaut']}</span>
-                <span style="width: 15%; text-align: right;">Level {row['Level']}</span>
-                <span style="width: 20%; text-align: right;">{row['Streak']} days 🔥</span>
-                <span style="width: 15%; text-align: right; font-weight: 700;">{row['XP']} XP</span>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown(render_leaderboard_rows(leaderboard_df), unsafe_allow_html=True)
         
         st.markdown("---")
         
@@ -783,53 +898,21 @@ elif st.session_state.page == 'dashboard':
         with col1:
             st.markdown("### 🎯 Top 5 by XP")
             
-            top5 = leaderboard_df.head(5)
-            fig_top = go.Figure()
-            fig_top.add_trace(go.Bar(
-                x=top5['XP'],
-                y=top5['Astronaut'],
-                orientation='h',
-                marker=dict(color=['#ffffff', '#cccccc', '#999999', '#666666', '#444444']),
-                text=top5['XP'],
-                textposition='auto'
-            ))
-            
-            fig_top.update_layout(
-                template='plotly_dark',
-                paper_bgcolor='rgba(0, 0, 0, 0)',
-                plot_bgcolor='rgba(26, 29, 62, 0.5)',
-                height=300,
-                font=dict(color='white'),
-                showlegend=False
-            )
+            top5 = leaderboard_page(0, 5, uid)
+            top5_version = tuple(top5.itertuples(index=False))
+            fig_top = cached_figure(uid, 'top_xp', top5_version, charts.top_xp, top5)
             
-            st.plotly_chart(fig_top, use_container_width=True)
+            show_figure('top_xp', fig_top)
         
         with col2:
             st.markdown("### 🔥 Streak Champions")
             
-            fig_streak = go.Figure()
-            fig_streak.add_trace(go.Bar(
-                x=top5['Astronaut'],
-                y=top5['Streak'],
-                marker=dict(color=top5['Streak'], colorscale='Greys', showscale=False),
-                text=top5['Streak'],
-                textposition='auto'
-            ))
+            fig_streak = cached_figure(uid, 'streak_champions', top5_version, charts.streak_champions, top5)
             
-            fig_streak.update_layout(
-                template='plotly_dark',
-                paper_bgcolor='rgba(0, 0, 0, 0)',
-                plot_bgcolor='rgba(26, 29, 62, 0.5)',
-                height=300,
-                font=dict(color='white'),
-                showlegend=False
-            )
-            
-            st.plotly_chart(fig_streak, use_container_width=True)
+            show_figure('streak_champions', fig_streak)
     
     # TAB 4: AI INSIGHTS
-    with tab4:
+    if active_view == VIEWS[3]:
         st.markdown("## 🤖 AI Insights - Your Cosmic Companion")
         
         # Chat Interface
@@ -853,8 +936,8 @@ elif st.session_state.page == 'dashboard':
             responses = [
                 f"Based on your data, you're performing at {completion_rate_today:.0f}% today! That's stellar progress! 🚀",
                 f"Your {user['total_streak']}-day streak shows incredible consistency. Keep that momentum! 💪",
-                "I analyzed your weekly pattern - you're strongest on weekends. Try scheduling challenging habits then! 📊",
-                "Your motivation correlates with completion rate. Maintaining high energy is key! ⚡",
+                f"I analyzed your weekly pattern - you're strongest on {DAY_NAMES[summary['best_day']]}s. Try scheduling challenging habits then! 📊",
+                f"Your mood and completion rate have a {summary['mood_correlation']:+.2f} correlation. Maintaining high energy is key! ⚡",
                 f"Consider habit stacking: pair new habits with your successful '{habits[0]['name']}' routine! 🎯"
             ]
             
@@ -872,26 +955,25 @@ elif st.session_state.page == 'dashboard':
             st.markdown("### 🎯 Personalized Insights")
             
             # Calculate insights
-            weekend_avg = progress_data[progress_data['day_of_week'].isin([5, 6])]['completion_rate'].mean()
-            weekday_avg = progress_data[~progress_data['day_of_week'].isin([5, 6])]['completion_rate'].mean()
+            weekend_avg = summary['weekend_avg']
+            weekday_avg = summary['weekday_avg']
             
             if weekend_avg > weekday_avg:
                 st.info(f"**Pattern Detected:** You complete {((weekend_avg/weekday_avg - 1) * 100):.0f}% more habits on weekends. Consider frontloading important tasks to Saturday-Sunday.")
             
             # Best habit
-            best_habit = max(habits, key=lambda h: h['streak'])
+            best_habit = summary['best_habit']
             st.success(f"**Winning Streak:** Your '{best_habit['name']}' habit has a {best_habit['streak']}-day streak! This discipline is inspiring other habits.")
             
             # Weakest habit
-            weak_habit = min(habits, key=lambda h: h['streak'])
+            weak_habit = summary['weak_habit']
             st.warning(f"**Needs Attention:** '{weak_habit['name']}' streak is at {weak_habit['streak']} days. Set a reminder to maintain consistency.")
         
         with col2:
             st.markdown("### 💡 AI Recommendations")
             
             # Best time
-            hourly_performance = progress_data.groupby('day_of_week')['completion_rate'].mean()
-            best_day = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][hourly_performance.idxmax()]
+            best_day = DAY_NAMES[summary['best_day']]
             
             st.info(f"**Optimal Time:** Data shows {best_day} is your peak performance day. Schedule difficult habits then.")
             
@@ -899,97 +981,86 @@ elif st.session_state.page == 'dashboard':
             st.success("**Habit Stacking:** Pair complementary habits together - they have higher co-completion rates.")
             
             # Energy management
-            worst_day = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'][hourly_performance.idxmin()]
+            worst_day = DAY_NAMES[summary['worst_day']]
             st.warning(f"**Energy Management:** Your completion rate is lowest on {worst_day}. Plan lighter habit loads.")
         
         # Mood vs Performance
         st.markdown("### 😊 Mood vs Performance Correlation")
         
-        fig_scatter = go.Figure()
-        fig_scatter.add_trace(go.Scatter(
-            x=progress_data['mood'],
-            y=progress_data['completion_rate'],
-            mode='markers',
-            marker=dict(
-                size=10,
-                color=progress_data['completion_rate'],
-                colorscale='Greys',
-                showscale=True
-            ),
-            text=progress_data['date'].dt.strftime('%Y-%m-%d')
-        ))
-        
-        fig_scatter.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='rgba(0, 0, 0, 0)',
-            plot_bgcolor='rgba(26, 29, 62, 0.5)',
-            xaxis_title="Mood Score",
-            yaxis_title="Completion Rate (%)",
-            height=400,
-            font=dict(color='white')
-        )
+        fig_scatter = cached_figure(uid, 'mood_scatter', user['version'], charts.mood_scatter, progress_data)
         
-        st.plotly_chart(fig_scatter, use_container_width=True)
+        show_figure('mood_scatter', fig_scatter)
     
     # TAB 5: PREDICTIONS
-    with tab5:
+    if active_view == VIEWS[4]:
         st.markdown("## 📈 AI-Powered Predictions")
         
-        # Train model
-        model = train_habit_predictor(progress_data)
+        training_rows = predictor.training_rows(progress_data)
+        data_version = frame_version(training_rows, PREDICTOR_COLUMNS)
+        with profiler.span('predictor'):
+            global_model = get_population_model().get()
+            if global_model is not None:
+                # The shared population model, calibrated to this user
+                model = global_model.for_user(uid, progress_data, len(habits))
+                # Its track-record feature reads every progress row, not just the training rows
+                progress_version = frame_version(progress_data, PREDICTOR_COLUMNS)
+                model_version, training = (global_model.version, progress_version, len(habits)), None
+            else:
+                # Until the first population model exists: the user's own model, trained in the background
+                model, model_version, training = get_habit_predictor(uid, training_rows)
+        if training == TRAINING:
+            training_status(uid, data_version, model is not None)
+        elif training == FAILED:
+            st.error(f"Model training failed: {get_training_queue().error(uid, data_version)}")
+        
+        if global_model is not None:
+            trained_ago = (datetime.now().timestamp() - global_model.trained_at) / 60
+            st.caption(
+                f"Population model: {global_model.rows:,} days from {global_model.users:,} astronauts, "
+                f"trained {trained_ago:.0f} min ago" + (" • retraining…" if get_population_model().training else "")
+            )
+        else:
+            cache_stats = get_model_cache().stats()
+            queue_stats = get_training_queue().stats()
+            st.caption(
+                f"Model cache: {cache_stats['hits']} hits • {cache_stats['disk_hits']} disk hits • "
+                f"{cache_stats['misses']} misses • "
+                f"{cache_stats['entries']} models in memory • {queue_stats['jobs']} training jobs "
+                f"(up to {queue_stats['max_workers']} at once, {queue_stats['pending']} waiting on newer data)"
+            )
         
         if model:
-            st.markdown("### 🔮 Success Probability Predictor")
+            st.markdown("### 🔮 What-If Success Map")
             
             col1, col2 = st.columns(2)
             
             with col1:
-                pred_day = st.selectbox("Day of Week", 
-                    ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
-                pred_mood = st.slider("Expected Mood", 1, 10, 7)
+                pred_day = st.selectbox("Day of Week", DAY_NAMES)
+                pred_habits = st.slider("Habits Completed So Far", 0, len(habits), len(habits) // 2)
             
             with col2:
+                pred_mood = st.slider("Expected Mood", 1, 10, 7)
                 pred_motivation = st.slider("Expected Motivation", 1, 10, 7)
-                pred_habits = st.slider("Habits Completed So Far", 0, len(habits), len(habits) // 2)
             
-            day_map = {'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 'Thursday': 3,
-                       'Friday': 4, 'Saturday': 5, 'Sunday': 6}
+            grid = cached_what_if_grid(uid, model_version, model, pred_habits)
+            day_grid = grid[DAY_NAMES.index(pred_day)]
+            success_prob = day_grid[pred_mood - 1, pred_motivation - 1]
             
-            if st.button("🚀 Predict Success Probability"):
-                input_data = np.array([[day_map[pred_day], pred_mood, pred_motivation, pred_habits]])
-                prediction_proba = model.predict_proba(input_data)[0]
-                success_prob = prediction_proba[1] * 100
-                
-                st.markdown("---")
-                
-                # Gauge Chart
-                fig_gauge = go.Figure(go.Indicator(
-                    mode="gauge+number+delta",
-                    value=success_prob,
-                    domain={'x': [0, 1], 'y': [0, 1]},
-                    title={'text': "Success Probability", 'font': {'size': 24, 'color': '#ffffff'}},
-                    delta={'reference': 80},
-                    gauge={
-                        'axis': {'range': [None, 100], 'tickcolor': "#ffffff"},
-                        'bar': {'color': "#ffffff"},
-                        'bgcolor': "rgba(10, 14, 39, 0.5)",
-                        'borderwidth': 2,
-                        'bordercolor': "#ffffff",
-                        'steps': [
-                            {'range': [0, 50], 'color': 'rgba(100, 100, 100, 0.3)'},
-                            {'range': [50, 80], 'color': 'rgba(150, 150, 150, 0.3)'},
-                            {'range': [80, 100], 'color': 'rgba(200, 200, 200, 0.3)'}
-                        ]
-                    }
-                ))
-                
-                fig_gauge.update_layout(
-                    paper_bgcolor='rgba(0, 0, 0, 0)',
-                    font={'color': "#ffffff"},
-                    height=400
-                )
+            # Built per rerun from the cached grid: keyed on the slider values, it would fill the shared
+            # figure cache with one entry per slider step and evict other users' figures
+            with profiler.span('figure:what_if'):
+                fig_whatif = charts.what_if_heatmap(day_grid, pred_mood, pred_motivation)
+            
+            col_map, col_days = st.columns([2, 1])
+            
+            with col_map:
+                show_figure('what_if', fig_whatif)
+            
+            with col_days:
+                st.metric(f"{pred_day} Success Probability", f"{success_prob:.1f}%", f"{success_prob - 80:+.1f} vs 80%")
                 
-                st.plotly_chart(fig_gauge, use_container_width=True)
+                best_day_idx = int(grid[:, pred_mood - 1, pred_motivation - 1].argmax())
+                st.caption(f"At mood {pred_mood} and motivation {pred_motivation}, {DAY_NAMES[best_day_idx]} is your strongest day.")
                 
                 if success_prob >= 80:
                     st.success(f"🌟 Excellent! {success_prob:.1f}% probability of hitting 80%+ completion!")
@@ -1003,82 +1074,30 @@ elif st.session_state.page == 'dashboard':
             # Feature Importance
             st.markdown("### 🎯 What Drives Your Success?")
             
-            feature_importance = pd.DataFrame({
-                'Feature': ['Motivation', 'Habits Completed', 'Mood', 'Day of Week'],
-                'Importance': [0.35, 0.30, 0.25, 0.10]
-            }).sort_values('Importance', ascending=True)
-            
-            fig_importance = go.Figure()
-            fig_importance.add_trace(go.Bar(
-                y=feature_importance['Feature'],
-                x=feature_importance['Importance'],
-                orientation='h',
-                marker=dict(color=feature_importance['Importance'], colorscale='Greys'),
-                text=[f"{v:.1%}" for v in feature_importance['Importance']],
-                textposition='auto'
-            ))
-            
-            fig_importance.update_layout(
-                template='plotly_dark',
-                paper_bgcolor='rgba(0, 0, 0, 0)',
-                plot_bgcolor='rgba(26, 29, 62, 0.5)',
-                xaxis_title="Importance Score",
-                height=300,
-                font=dict(color='white')
+            fig_importance = cached_figure(
+                uid, 'importance', model_version, lambda: charts.feature_importance(predictor.importances(model))
             )
             
-            st.plotly_chart(fig_importance, use_container_width=True)
+            show_figure('importance', fig_importance)
+            st.caption(
+                f"Share of prediction accuracy lost when each factor is shuffled "
+                f"({model.n_estimators} trees, {getattr(model, 'training_rows_', len(progress_data)):,} days)."
+            )
             
             # 7-Day Forecast
             st.markdown("### 📅 7-Day Success Forecast")
             
-            forecast_data = []
-            for i in range(7):
-                future_date = datetime.now() + timedelta(days=i)
-                day_of_week = future_date.weekday()
-                
-                avg_mood = progress_data['mood'].mean()
-                avg_motivation = progress_data['motivation'].mean()
-                avg_habits = progress_data['habits_completed'].mean()
-                
-                input_pred = np.array([[day_of_week, avg_mood, avg_motivation, avg_habits]])
-                prob = model.predict_proba(input_pred)[0][1] * 100
-                
-                forecast_data.append({
-                    'Date': future_date.strftime('%a, %b %d'),
-                    'Success Probability': prob
-                })
-            
-            forecast_df = pd.DataFrame(forecast_data)
-            
-            fig_forecast = go.Figure()
-            fig_forecast.add_trace(go.Scatter(
-                x=forecast_df['Date'],
-                y=forecast_df['Success Probability'],
-                mode='lines+markers',
-                line=dict(color='#ffffff', width=3),
-                marker=dict(size=10, color='#cccccc'),
-                fill='tozeroy',
-                fillcolor='rgba(255, 255, 255, 0.2)'
-            ))
-            
-            fig_forecast.update_layout(
-                template='plotly_dark',
-                paper_bgcolor='rgba(0, 0, 0, 0)',
-                plot_bgcolor='rgba(26, 29, 62, 0.5)',
-                xaxis_title="Date",
-                yaxis_title="Success Probability (%)",
-                height=400,
-                yaxis=dict(range=[0, 100]),
-                font=dict(color='white')
+            fig_forecast = cached_figure(
+                uid, 'forecast', (model_version, today),
+                lambda: charts.success_forecast(forecast_success(model, progress_data))
             )
             
-            st.plotly_chart(fig_forecast, use_container_width=True)
-        else:
+            show_figure('forecast', fig_forecast)
+        elif training == NO_DATA:
             st.info("Need more data to generate predictions. Complete more habits!")
     
     # TAB 6: JOURNAL & ZEN
-    with tab6:
+    if active_view == VIEWS[5]:
         st.markdown("## 🧘 Mindfulness & Reflection")
         
         col1, col2 = st.columns([2, 1])
@@ -1093,54 +1112,84 @@ elif st.session_state.page == 'dashboard':
             
             if st.button("💾 Save Entry", use_container_width=True):
                 if journal_text:
-                    # Sentiment analysis (simple)
-                    positive_words = ['good', 'great', 'happy', 'productive', 'awesome', 'focus', 'energy']
-                    is_positive = any(word in journal_text.lower() for word in positive_words)
-                    
-                    bonus = 50 if is_positive else 20
-                    sentiment = "Positive" if is_positive else "Neutral"
+                    sentiment = get_sentiment_scorer().classify(journal_text)
+                    bonus = 50 if sentiment == "Positive" else 20
                     
                     # Save entry
-                    st.session_state.journal_db[uid].append({
+                    db.add_journal_entry(uid, {
                         'date': datetime.now().isoformat(),
                         'text': journal_text,
                         'sentiment': sentiment
                     })
                     
-                    user['xp'] += bonus
+                    db.add_xp(uid, bonus)
                     
                     # Check achievements
-                    new_badges = check_achievements(uid)
+                    with profiler.span('achievements'):
+                        new_badges = get_achievement_engine().on_journal_saved(uid, user['xp'] + bonus)
                     if new_badges:
                         st.balloons()
                     
                     st.success(f"Entry Saved! Sentiment: {sentiment} (+{bonus} XP)")
-                    st.rerun()
+                    rerun()
         
         with col2:
-            st.markdown("### 📚 Recent Entries")
-            entries = st.session_state.journal_db.get(uid, [])
+            st.markdown("### 📚 Journal Archive")
+            if 'journal_cursors' not in st.session_state:
+                reset_journal_pages()
             
-            if not entries:
-                st.info("No entries yet. Start journaling!")
+            search_query = st.text_input(
+                "Search entries", key="journal_query", placeholder="focus, gym, deadline...", on_change=reset_journal_pages
+            )
+            date_range = st.date_input("Date range", value=(), key="journal_dates", on_change=reset_journal_pages)
+            range_start = date_range[0] if len(date_range) > 0 else None
+            range_end = date_range[1] if len(date_range) > 1 else None
+            
+            if search_query.strip():
+                # Ranked matches from the full-text index, a page at a time
+                offset = st.session_state.journal_offset
+                total, entries = db.search_journal(
+                    uid, search_query, range_start, range_end, limit=JOURNAL_PAGE_SIZE, offset=offset
+                )
+                if not entries:
+                    st.info("No entries match your search.")
+                else:
+                    st.caption(f"Results {offset + 1}–{offset + len(entries)} of {total:,}")
+                    for entry in entries:
+                        render_journal_entry(entry)
+                    col_prev, col_next = st.columns(2)
+                    with col_prev:
+                        st.button("⬅️ Better matches", disabled=offset == 0, key="journal_prev",
+                                  on_click=set_journal_offset, args=(offset - JOURNAL_PAGE_SIZE,))
+                    with col_next:
+                        st.button("More ➡️", disabled=offset + JOURNAL_PAGE_SIZE >= total, key="journal_next",
+                                  on_click=set_journal_offset, args=(offset + JOURNAL_PAGE_SIZE,))
             else:
-                for entry in reversed(entries[-5:]):
-                    entry_date = datetime.fromisoformat(entry['date']).strftime('%b %d, %Y')
-                    st.markdown(f"""
-                    <div style="background: rgba(255,255,255,0.05); padding: 15px; border-radius: 10px; margin-bottom: 10px; border-left: 3px solid #ffffff;">
-                        <small style="color: #888">{entry_date}</small><br>
-                        <i style="color: #ddd">"{entry['text'][:80]}..."</i><br>
-                        <small style="color: #aaa">Sentiment: {entry.get('sentiment', 'N/A')}</small>
-                    </div>
-                    """, unsafe_allow_html=True)
+                # Newest first, paging back by (date, id) cursor so older pages cost the same as the first
+                cursors = st.session_state.journal_cursors
+                entries = db.journal_page(
+                    uid, cursors[-1] if cursors else None, JOURNAL_PAGE_SIZE, range_start, range_end
+                )
+                if not entries and not cursors:
+                    st.info("No entries yet. Start journaling!")
+                else:
+                    for entry in entries:
+                        render_journal_entry(entry)
+                    col_prev, col_next = st.columns(2)
+                    with col_prev:
+                        st.button("⬅️ Newer", disabled=not cursors, key="journal_newer", on_click=newer_journal_page)
+                    with col_next:
+                        st.button("Older ➡️", disabled=len(entries) < JOURNAL_PAGE_SIZE, key="journal_older",
+                                  on_click=older_journal_page, args=(entries[-1] if entries else None,))
         
         st.markdown("---")
         
         # Achievements Display
         st.markdown("## 🏆 Trophy Case")
         
-        all_achievements = get_achievements_list()
-        unlocked_ids = st.session_state.achievements_db.get(uid, [])
+        all_achievements = ACHIEVEMENTS
+        with profiler.span('achievements'):
+            unlocked_ids = get_achievement_engine().unlocked(uid)
         
         cols = st.columns(4)
         for i, achievement in enumerate(all_achievements):
@@ -1162,6 +1211,8 @@ elif st.session_state.page == 'dashboard':
         achievement_progress = len(unlocked_ids) / len(all_achievements)
         st.progress(achievement_progress)
         st.caption(f"{len(unlocked_ids)} / {len(all_achievements)} Achievements Unlocked")
+    
+    profiler.end()
 
 # Footer
 st.markdown("---")
@@ -1171,4 +1222,14 @@ st.markdown("""
     <p style='font-style: italic; color: #666;'>Small Steps. Cosmic Results.</p>
     <p style='font-size: 11px; margin-top: 20px;'>Powered by AI • Built with Streamlit • v2.0</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+# Profiler panel
+if profiler.enabled:
+    profiler.stop()
+    with st.sidebar.expander("🛠 Profiler", expanded=False):
+        st.caption(f"Script run: {profiler.elapsed_ms():.1f} ms")
+        st.dataframe(pd.DataFrame(profiler.summary()).round({'Total ms': 2}), hide_index=True, use_container_width=True)
+        st.download_button("⬇ Chrome trace", profiler.chrome_trace(), file_name="stridex-trace.json", mime="application/json")
+        if profiler.profile is not None:
+            st.download_button("⬇ cProfile stats", profiler.pstats_bytes(), file_name="stridex.prof")
+            st.code(profiler.top_functions(), language=None)
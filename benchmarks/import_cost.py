@@ -0,0 +1,125 @@
+"""Cold-start import cost of app6.py.
+
+Each scenario runs in a fresh interpreter under `python -X importtime`: Streamlit and AppTest
+are imported first, then the app's first script run is timed and every module it pulls in is
+attributed to its top-level package. Background model training is switched off in the child,
+since its threads import sklearn concurrently and -X importtime cannot tell threads apart.
+
+    python benchmarks/import_cost.py [--scenarios landing,dashboard,predictions] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKER = '--- first run ---'
+END_MARKER = '--- first run done ---'
+
+# Runs inside the child interpreter; {view} is None for the landing page
+CHILD = """
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+# Fits happen off the request path, so they are not part of the first run: queued jobs finish
+# without a model and the population model never refreshes, which keeps sklearn's imports on
+# worker threads out of the log. Both modules only need numpy/pandas, already loaded here.
+import predictor
+from population import PopulationModel
+predictor.train = lambda df, previous=None, n_jobs=-1: None
+PopulationModel.refresh = lambda self, wait=False: None
+if {view!r} is not None:
+    from storage import open_storage
+    from synthetic import seed_user, synthetic_habit_names
+    storage = open_storage()
+    seed_user(storage, 'cold-start', 'cold-start', synthetic_habit_names(5), days=60, seed=0)
+    storage.close()
+at = AppTest.from_file(os.path.join({root!r}, 'app6.py'), default_timeout=300)
+if {view!r} is not None:
+    at.session_state.user_id = 'cold-start'
+    at.session_state.page = 'dashboard'
+    at.session_state.active_view = {view!r}
+sys.stderr.write({marker!r} + '\\n')
+sys.stderr.flush()
+start = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - start
+sys.stderr.write({end_marker!r} + '\\n')
+sys.stderr.flush()
+if at.exception:
+    raise SystemExit(at.exception[0].message)
+print(json.dumps({{'wall_ms': elapsed * 1000}}))
+"""
+
+SCENARIOS = {
+    'landing': None,
+    'dashboard': '🎯 Command Center',
+    'analytics': '📊 Analytics Lab',
+    'predictions': '📈 Predictions'
+}
+
+
+def parse_importtime(stderr):
+    """Per-package self time and top-level cumulative times (ms) for imports between the markers."""
+    lines = stderr.split(MARKER, 1)[-1].split(END_MARKER, 1)[0].splitlines()
+    packages = defaultdict(float)
+    roots = []
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        module = name.strip()
+        if int(self_us) < 0:
+            # Imports interleaved from another thread; the log can no longer be attributed
+            raise ValueError(f"negative self time for {module}: {self_us.strip()} us")
+        packages[module.split('.')[0]] += int(self_us) / 1000
+        if depth == 0:
+            roots.append((module, int(cumulative_us) / 1000))
+    return packages, roots
+
+
+def run_scenario(name, view):
+    env = dict(os.environ)
+    workdir = tempfile.mkdtemp(prefix='stridex-startup-')
+    env['STRIDEX_DB'] = os.path.join(workdir, 'startup.db')
+    env['STRIDEX_MODEL_CACHE_DIR'] = os.path.join(workdir, 'models')
+    code = CHILD.format(root=ROOT, view=view, marker=MARKER, end_marker=END_MARKER)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, env=env, cwd=workdir
+    )
+    if result.returncode:
+        raise RuntimeError(f"{name} failed:\n{result.stderr[-2000:]}")
+    packages, roots = parse_importtime(result.stderr)
+    return {
+        'wall_ms': round(json.loads(result.stdout.strip().splitlines()[-1])['wall_ms'], 1),
+        'import_ms': round(sum(packages.values()), 1),
+        'packages_ms': {k: round(v, 1) for k, v in sorted(packages.items(), key=lambda kv: -kv[1]) if v >= 1},
+        'top_imports_ms': [(m, round(ms, 1)) for m, ms in sorted(roots, key=lambda r: -r[1])[:15]]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--output', default='startup.json')
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.scenarios.split(','):
+        results[name] = run_scenario(name, SCENARIOS[name])
+        print(f"{name:12s} first run {results[name]['wall_ms']:8.1f} ms, of which imports "
+              f"{results[name]['import_ms']:8.1f} ms")
+        for package, ms in list(results[name]['packages_ms'].items())[:5]:
+            print(f"    {package:24s} {ms:8.1f} ms")
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""Headless rerun-latency benchmark for app6.py.
+
+Drives the dashboard with Streamlit's AppTest against a fresh SQLite database per scenario,
+seeded through synthetic.seed_user, the same path the app's create_user uses.
+
+    python benchmarks/rerun_latency.py --scales 60x5,365x10,1825x30 --users 1,1000,100000 \
+        --repeat 10 --output bench.json [--baseline previous.json --tolerance 0.25]
+
+Every timing is reported in milliseconds with p50/p95 over --repeat samples. With --baseline,
+any p50 that grew by more than --tolerance is listed and the script exits with status 1.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from storage import open_storage  # noqa: E402
+from synthetic import seed_user, synthetic_habit_names  # noqa: E402
+
+APP = os.path.join(ROOT, 'app6.py')
+
+
+def parse_scales(text):
+    return [tuple(int(v) for v in part.split('x')) for part in text.split(',')]
+
+
+def summarize(samples):
+    values = np.array(samples) * 1000
+    return {
+        'p50': round(float(np.percentile(values, 50)), 2),
+        'p95': round(float(np.percentile(values, 95)), 2),
+        'samples': [round(float(v), 2) for v in values]
+    }
+
+
+def timed(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed
+
+
+def new_app(timeout):
+    return AppTest.from_file(APP, default_timeout=timeout)
+
+
+def run_scenario(days, n_habits, n_users, repeat, background_days, timeout):
+    workdir = tempfile.mkdtemp(prefix='stridex-bench-')
+    os.environ['STRIDEX_DB'] = os.path.join(workdir, 'bench.db')
+    os.environ['STRIDEX_MODEL_CACHE_DIR'] = os.path.join(workdir, 'models')
+    st.cache_resource.clear()
+
+    storage = open_storage()
+    seed_start = time.perf_counter()
+    seed_user(storage, 'bench-user', 'astronaut-bench-user', synthetic_habit_names(n_habits), days=days, seed=0)
+    for i in range(1, n_users):
+        seed_user(storage, f"bench-{i}", f"astronaut-bench-{i}", synthetic_habit_names(5), days=background_days, seed=i)
+    seed_seconds = time.perf_counter() - seed_start
+    storage.close()
+
+    timings = {}
+
+    # Landing -> dashboard goes through the real signup form (60 days, 5 habits)
+    samples = []
+    for i in range(repeat):
+        at = new_app(timeout)
+        at.run()
+        at.text_input(key='username_landing').input(f"signup-{i}")
+        at.button[0].click()
+        samples.append(timed(at))
+    timings['landing_to_dashboard'] = summarize(samples)
+
+    # Everything else runs as the seeded user at the requested scale
+    at = new_app(timeout)
+    at.session_state.user_id = 'bench-user'
+    at.session_state.page = 'dashboard'
+    timings['dashboard_first_render'] = summarize([timed(at)])
+
+    samples = []
+    for _ in range(repeat):
+        checkbox = at.checkbox[0]
+        checkbox.uncheck() if checkbox.value else checkbox.check()
+        samples.append(timed(at))
+    timings['checkbox_toggle'] = summarize(samples)
+
+    views = at.radio(key='active_view').options
+    view_samples = {view: [] for view in views}
+    for _ in range(repeat):
+        for view in views:
+            at.radio(key='active_view').set_value(view)
+            view_samples[view].append(timed(at))
+    for view, samples in view_samples.items():
+        timings[f"view:{view}"] = summarize(samples)
+
+    at.radio(key='active_view').set_value(views[-1])
+    timed(at)
+    samples = []
+    for i in range(repeat):
+        at.text_area[0].input(f"Benchmark reflection {i}: good focus today")
+        next(b for b in at.button if 'Save Entry' in b.label).click()
+        samples.append(timed(at))
+    timings['journal_save'] = summarize(samples)
+
+    return {
+        'days': days,
+        'habits': n_habits,
+        'users': n_users,
+        'seed_seconds': round(seed_seconds, 2),
+        'timings_ms': timings
+    }
+
+
+def compare(results, baseline, tolerance):
+    def key(scenario):
+        return (scenario['days'], scenario['habits'], scenario['users'])
+
+    previous = {key(s): s['timings_ms'] for s in baseline['scenarios']}
+    regressions = []
+    for scenario in results['scenarios']:
+        for metric, stats in scenario['timings_ms'].items():
+            old = previous.get(key(scenario), {}).get(metric)
+            if old and old['p50'] > 0 and stats['p50'] > old['p50'] * (1 + tolerance):
+                regressions.append(
+                    f"{key(scenario)} {metric}: p50 {old['p50']}ms -> {stats['p50']}ms"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', default='60x5,365x10,1825x30', help='DAYSxHABITS list for the measured user')
+    parser.add_argument('--users', default='1,1000', help='total user counts, e.g. 1,1000,100000')
+    parser.add_argument('--background-days', type=int, default=7, help='history length for the other users')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--output', default='bench.json')
+    parser.add_argument('--baseline', help='previous results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p50 growth before flagging')
+    args = parser.parse_args()
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'streamlit': st.__version__,
+            'platform': platform.platform(),
+            'repeat': args.repeat
+        },
+        'scenarios': []
+    }
+    for days, n_habits in parse_scales(args.scales):
+        for n_users in (int(u) for u in args.users.split(',')):
+            print(f"scenario: {days} days x {n_habits} habits, {n_users} users", flush=True)
+            results['scenarios'].append(
+                run_scenario(days, n_habits, n_users, args.repeat, args.background_days, args.timeout)
+            )
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
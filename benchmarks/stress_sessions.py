@@ -0,0 +1,182 @@
+"""Concurrent-session stress test for the process-wide shared stores.
+
+Builds the same shared resources app6.py keeps in st.cache_resource (storage, leaderboard
+index, progress store, achievement engine, summary cache) and runs many simulated sessions
+against them from threads. Several sessions share a user, like one person with two tabs open.
+
+    python benchmarks/stress_sessions.py --sessions 48 --users 24 --iterations 200
+
+Each session checks habits on and off, earns XP, catches up and reads its progress, and pages
+through the leaderboard. Afterwards every user's leaderboard XP, achievement counters, streaks,
+daily completion counts and progress rows are checked against storage; any mismatch or session
+error exits with status 1.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from achievements import AchievementEngine  # noqa: E402
+from analytics import SummaryCache  # noqa: E402
+from leaderboard import LeaderboardIndex  # noqa: E402
+from progress_store import ProgressStore  # noqa: E402
+from storage import open_storage  # noqa: E402
+from streaks import bitmap_streaks, current  # noqa: E402
+from synthetic import seed_user, synthetic_habit_names  # noqa: E402
+
+
+def build_resources(path):
+    storage = open_storage(path=path)
+    leaderboard = LeaderboardIndex(storage.xp_scores())
+    storage.subscribe_xp(leaderboard.update)
+    return {
+        'storage': storage,
+        'leaderboard': leaderboard,
+        'progress': ProgressStore(storage),
+        'achievements': AchievementEngine(storage),
+        'summaries': SummaryCache()
+    }
+
+
+def seed_users(storage, count, days, lag):
+    # History stops `lag` days ago so the first sessions race to catch each user up
+    end = date.today() - timedelta(days=lag)
+    return [
+        seed_user(storage, f"stress-{i}", f"astronaut-{i}", synthetic_habit_names(5), days=days, seed=i, end=end)
+        for i in range(count)
+    ]
+
+
+def session(resources, user_id, iterations, seed, reads, errors):
+    storage = resources['storage']
+    rng = random.Random(seed)
+    today = date.today().isoformat()
+    try:
+        for _ in range(iterations):
+            # One rerun: load, catch up, summarise, then a write and a leaderboard read
+            start = time.perf_counter()
+            user = storage.get_user(user_id)
+            habits = storage.get_habits(user_id)
+            if resources['progress'].catch_up(user_id, habits, today):
+                user = storage.get_user(user_id)
+            frame = resources['progress'].frame(user_id)
+            resources['summaries'].get(user_id, user['version'], frame, habits)
+            reads.append(time.perf_counter() - start)
+
+            action = rng.random()
+            if action < 0.6:
+                habit = rng.choice(habits)
+                done = today not in habit['completions']
+                streaks = storage.set_completion(user_id, habit['id'], today, done)
+                if streaks:
+                    completed = storage.completed_on(user_id, today)
+                    resources['achievements'].on_habit_toggled(
+                        user_id, done, len(completed), len(habits), storage.get_user(user_id)['xp'],
+                        streaks['total_streak']
+                    )
+            elif action < 0.8:
+                storage.add_xp(user_id, rng.choice([20, 50]))
+
+            start = time.perf_counter()
+            rank = resources['leaderboard'].rank(user_id)
+            entries = resources['leaderboard'].page(max(0, rank - 25), 50)
+            storage.get_users(u for _, u, _ in entries)
+            reads.append(time.perf_counter() - start)
+    except Exception as exc:
+        errors.append(f"{user_id}: {exc!r}")
+
+
+def verify(resources, user_ids):
+    storage = resources['storage']
+    problems = []
+    for user_id in user_ids:
+        xp = storage.get_user(user_id)['xp']
+        if resources['leaderboard'].xp(user_id) != xp:
+            problems.append(f"{user_id}: leaderboard xp {resources['leaderboard'].xp(user_id)} != stored {xp}")
+
+        habits = storage.get_habits(user_id)
+        completions = sum(h['completions'].total() for h in habits)
+        counted = resources['achievements']._state(user_id)['completions']
+        if counted != completions:
+            problems.append(f"{user_id}: achievement completions {counted} != stored {completions}")
+
+        # The per-day completion counts must add up to the habits' check-ins, day by day
+        days, counts = storage.daily_completions(user_id)
+        checked = np.concatenate([np.flatnonzero(h['completions'].to_array()) + h['completions'].epoch for h in habits])
+        check_days, check_counts = np.unique(checked, return_counts=True)
+        if not (np.array_equal(days, check_days) and np.array_equal(counts, check_counts)):
+            problems.append(f"{user_id}: daily completion counts disagree with the habit check-ins")
+
+        # Incrementally maintained streaks must match a from-scratch recompute of the check-ins
+        latest, ends, longest = bitmap_streaks([h['completions'] for h in habits])
+        expected = [current(int(run), int(end), date.today()) for run, end in zip(latest, ends)]
+        if [h['streak'] for h in habits] != expected or [h['longest_streak'] for h in habits] != longest.tolist():
+            problems.append(f"{user_id}: stored streaks {[(h['streak'], h['longest_streak']) for h in habits]} "
+                            f"!= recomputed {list(zip(expected, longest.tolist()))}")
+        if storage.get_user(user_id)['total_streak'] != int(longest.max(initial=0)):
+            problems.append(f"{user_id}: total_streak {storage.get_user(user_id)['total_streak']} "
+                            f"!= longest habit streak {int(longest.max(initial=0))}")
+
+        cached = resources['progress'].frame(user_id)
+        stored = storage.get_progress(user_id)
+        if len(cached) != len(stored) or cached['date'].duplicated().any():
+            problems.append(f"{user_id}: progress store has {len(cached)} rows, storage has {len(stored)}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=48)
+    parser.add_argument('--users', type=int, default=24)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--lag', type=int, default=3, help='days of missing progress per user at start')
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix='stridex-stress-'), 'stress.db')
+    resources = build_resources(path)
+    user_ids = seed_users(resources['storage'], args.users, args.days, args.lag)
+    # Counters load from storage on first use; load them before any session writes
+    for user_id in user_ids:
+        resources['achievements'].unlocked(user_id)
+
+    reads, errors = [], []
+    threads = [
+        threading.Thread(
+            target=session,
+            args=(resources, user_ids[i % len(user_ids)], args.iterations, i, reads, errors)
+        )
+        for i in range(args.sessions)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(reads) * 1000
+    print(f"{args.sessions} sessions x {args.iterations} reruns over {args.users} users in {elapsed:.1f}s")
+    print(f"read latency p50 {np.percentile(latencies, 50):.2f} ms, p95 {np.percentile(latencies, 95):.2f} ms, "
+          f"max {latencies.max():.2f} ms")
+
+    problems = errors + verify(resources, user_ids)
+    for problem in problems:
+        print(f"FAIL {problem}")
+    resources['storage'].close()
+    if problems:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+
+# --- LAZY PLOTLY ---
+@lru_cache(maxsize=None)
+def graph_objects():
+    """plotly.graph_objects, imported on the first figure built rather than at app start.
+
+    Also registers the shared dark template, once per process; every figure references it
+    by name instead of repeating the layout block.
+    """
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    template = go.layout.Template(pio.templates['plotly_dark'])
+    template.layout.update(
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        plot_bgcolor='rgba(26, 29, 62, 0.5)',
+        font=dict(color='white'),
+        polar=dict(bgcolor='rgba(10, 14, 39, 0.5)')
+    )
+    pio.templates['stridex'] = template
+    return go
+
+DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+# --- FIGURE CACHE ---
+class FigureCache:
+    """LRU of built figures (and the costly arrays some are drawn from) keyed by (owner, chart, data version).
+
+    Cached go.Figure objects are handed to st.plotly_chart as-is: Streamlit serialises a
+    Figure without re-validating it, which a plain dict spec would trigger.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build, *args):
+        with self._lock:
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return self._figures[key]
+            self.misses += 1
+        figure = build(*args)
+        with self._lock:
+            self._figures[key] = figure
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return figure
+
+
+# --- FIGURE BUILDERS ---
+def completion_trend(progress_data, today=None, today_rate=None):
+    # Stored history covers finished days; today's in-progress rate is drawn as a separate point
+    go = graph_objects()
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=progress_data['date'],
+        y=progress_data['completion_rate'],
+        mode='lines+markers',
+        name='Completion Rate',
+        line=dict(color='#ffffff', width=3),
+        fill='tozeroy',
+        fillcolor='rgba(255, 255, 255, 0.2)'
+    ))
+    if today is not None:
+        fig.add_trace(go.Scatter(
+            x=[today],
+            y=[today_rate],
+            mode='markers',
+            name='Today (in progress)',
+            marker=dict(size=12, color='rgba(0, 0, 0, 0)', line=dict(color='#ffffff', width=2))
+        ))
+    fig.update_layout(
+        template='stridex',
+        height=400,
+        xaxis_title="Date",
+        yaxis_title="Completion Rate (%)",
+        hovermode='x unified'
+    )
+    return fig
+
+
+def weekly_radar(weekday_profile):
+    go = graph_objects()
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=weekday_profile,
+        theta=DAYS,
+        fill='toself',
+        fillcolor='rgba(255, 255, 255, 0.2)',
+        line=dict(color='#ffffff', width=2)
+    ))
+    fig.update_layout(
+        template='stridex',
+        polar=dict(radialaxis=dict(range=[0, 100], showticklabels=True)),
+        height=400
+    )
+    return fig
+
+
+def habit_strength(habits):
+    go = graph_objects()
+    strengths = [h['streak'] * 3.5 for h in habits]
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=[h['name'] for h in habits],
+        x=strengths,
+        orientation='h',
+        marker=dict(color=strengths, colorscale='Greys', showscale=True)
+    ))
+    fig.update_layout(template='stridex', xaxis_title="Strength Score", height=400)
+    return fig
+
+
+def category_radar(category_scores):
+    go = graph_objects()
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolar(
+        r=list(category_scores.values()),
+        theta=list(category_scores.keys()),
+        fill='toself',
+        fillcolor='rgba(255, 255, 255, 0.2)',
+        line=dict(color='#ffffff', width=2)
+    ))
+    fig.update_layout(template='stridex', polar=dict(radialaxis=dict(range=[0, 100])), height=400)
+    return fig
+
+
+def top_xp(top5):
+    go = graph_objects()
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=top5['XP'],
+        y=top5['Astronaut'],
+        orientation='h',
+        marker=dict(color=['#ffffff', '#cccccc', '#999999', '#666666', '#444444'][:len(top5)]),
+        text=top5['XP'],
+        textposition='auto'
+    ))
+    fig.update_layout(template='stridex', height=300, showlegend=False)
+    return fig
+
+
+def streak_champions(top5):
+    go = graph_objects()
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=top5['Astronaut'],
+        y=top5['Streak'],
+        marker=dict(color=top5['Streak'], colorscale='Greys', showscale=False),
+        text=top5['Streak'],
+        textposition='auto'
+    ))
+    fig.update_layout(template='stridex', height=300, showlegend=False)
+    return fig
+
+
+def mood_scatter(progress_data):
+    go = graph_objects()
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=progress_data['mood'],
+        y=progress_data['completion_rate'],
+        mode='markers',
+        marker=dict(size=10, color=progress_data['completion_rate'], colorscale='Greys', showscale=True),
+        text=progress_data['date'].dt.strftime('%Y-%m-%d')
+    ))
+    fig.update_layout(
+        template='stridex',
+        xaxis_title="Mood Score",
+        yaxis_title="Completion Rate (%)",
+        height=400
+    )
+    return fig
+
+
+def what_if_heatmap(day_grid, mood, motivation):
+    go = graph_objects()
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        z=day_grid,
+        x=list(range(1, 11)),
+        y=list(range(1, 11)),
+        zmin=0,
+        zmax=100,
+        colorscale='Greys',
+        colorbar=dict(title='%'),
+        hovertemplate='Mood %{y} • Motivation %{x}<br>Success %{z:.1f}%<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=[motivation],
+        y=[mood],
+        mode='markers',
+        marker=dict(size=18, color='rgba(0, 0, 0, 0)', line=dict(color='#ffffff', width=3)),
+        hoverinfo='skip',
+        showlegend=False
+    ))
+    fig.update_layout(template='stridex', xaxis_title="Motivation", yaxis_title="Mood", height=400)
+    return fig
+
+
+def feature_importance(importance):
+    go = graph_objects()
+    importance = importance.sort_values('Importance', ascending=True)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=importance['Feature'],
+        x=importance['Importance'],
+        orientation='h',
+        marker=dict(color=importance['Importance'], colorscale='Greys'),
+        text=[f"{v:.1%}" for v in importance['Importance']],
+        textposition='auto'
+    ))
+    fig.update_layout(template='stridex', xaxis_title="Importance Score", height=300)
+    return fig
+
+
+def success_forecast(forecast_df):
+    go = graph_objects()
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=forecast_df['Date'],
+        y=forecast_df['Success Probability'],
+        mode='lines+markers',
+        line=dict(color='#ffffff', width=3),
+        marker=dict(size=10, color='#cccccc'),
+        fill='tozeroy',
+        fillcolor='rgba(255, 255, 255, 0.2)'
+    ))
+    fig.update_layout(
+        template='stridex',
+        xaxis_title="Date",
+        yaxis_title="Success Probability (%)",
+        height=400,
+        yaxis=dict(range=[0, 100])
+    )
+    return fig
+
+
+def calendar_heatmap(z, dates, unit='completed'):
+    """GitHub-style calendar from analytics.calendar_grid blocks, stacked newest year on top."""
+    go = graph_objects()
+    years, _, weeks = z.shape
+    # A blank row between blocks; stacking is one concatenate + reshape of the (years, 7, weeks) arrays
+    rows = np.concatenate([z, np.full((years, 1, weeks), np.nan)], axis=1).reshape(-1, weeks)[:-1]
+    labels = np.concatenate(
+        [dates.astype(str), np.full((years, 1, weeks), '', dtype=object)], axis=1
+    ).reshape(-1, weeks)[:-1]
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        z=rows,
+        customdata=labels,
+        zmin=0,
+        zmax=max(1, np.nanmax(z)) if np.isfinite(z).any() else 1,
+        colorscale=[[0, 'rgba(255, 255, 255, 0.06)'], [1, '#ffffff']],
+        xgap=3,
+        ygap=3,
+        showscale=False,
+        hoverongaps=False,
+        hovertemplate=f"%{{customdata}}<br>%{{z:.0f}} {unit}<extra></extra>"
+    ))
+    # Label Mon/Wed/Fri of every block, and each block's date range on its first row
+    tickvals = [block * 8 + day for block in range(years) for day in (0, 2, 4)]
+    ticktext = [
+        f"{str(dates[block, 0, 0])[:7]} → {str(dates[block, 6, -1])[:7]}  {DAYS[day]}" if day == 0 else DAYS[day]
+        for block in range(years) for day in (0, 2, 4)
+    ]
+    fig.update_layout(
+        template='stridex',
+        height=80 + 130 * years,
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        xaxis=dict(showticklabels=False, showgrid=False, zeroline=False),
+        yaxis=dict(tickvals=tickvals, ticktext=ticktext, autorange='reversed', showgrid=False, zeroline=False),
+        margin=dict(l=10, r=10, t=10, b=10)
+    )
+    return fig
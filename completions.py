@@ -0,0 +1,145 @@
+from datetime import date
+
+import numpy as np
+
+# date.toordinal() of 1970-01-01, for converting datetime64 days to ordinals
+UNIX_EPOCH_ORDINAL = 719163
+
+
+def to_ordinal(day):
+    if isinstance(day, int):
+        return day
+    if isinstance(day, str):
+        day = date.fromisoformat(day[:10])
+    elif hasattr(day, 'date') and callable(day.date):
+        day = day.date()
+    return day.toordinal()
+
+
+# --- COMPLETION BITMAP ---
+class CompletionBitmap:
+    """Per-habit set of completed days, one bit per day counted from an epoch day.
+
+    Membership and toggling are O(1); totals and multi-habit views run over the unpacked
+    bit array (streaks live in streaks.py). A year of history costs 46 bytes.
+    """
+
+    __slots__ = ('epoch', 'bits')
+
+    def __init__(self, epoch, bits=b''):
+        self.epoch = to_ordinal(epoch)
+        self.bits = bytearray(bits)
+
+    @classmethod
+    def from_dates(cls, epoch, days):
+        bitmap = cls(epoch)
+        for day in days:
+            bitmap.add(day)
+        return bitmap
+
+    @classmethod
+    def from_array(cls, epoch, completed):
+        return cls(epoch, np.packbits(np.asarray(completed, dtype=bool), bitorder='little').tobytes())
+
+    def to_bytes(self):
+        return bytes(self.bits)
+
+    @property
+    def epoch_date(self):
+        return date.fromordinal(self.epoch)
+
+    def _offset(self, day):
+        offset = to_ordinal(day) - self.epoch
+        if offset < 0:
+            self._rebase(self.epoch + offset)
+            offset = 0
+        return offset
+
+    def _rebase(self, new_epoch):
+        # Moving the epoch back shifts every bit; only happens for back-dated check-ins
+        shift = self.epoch - new_epoch
+        self.bits = bytearray(CompletionBitmap.from_array(new_epoch, np.concatenate([
+            np.zeros(shift, dtype=bool), self.to_array()
+        ])).bits)
+        self.epoch = new_epoch
+
+    def __contains__(self, day):
+        offset = to_ordinal(day) - self.epoch
+        if offset < 0 or offset >> 3 >= len(self.bits):
+            return False
+        return bool(self.bits[offset >> 3] & (1 << (offset & 7)))
+
+    def add(self, day):
+        """Mark a day as completed; returns False if it already was."""
+        offset = self._offset(day)
+        byte, mask = offset >> 3, 1 << (offset & 7)
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte - len(self.bits) + 1))
+        elif self.bits[byte] & mask:
+            return False
+        self.bits[byte] |= mask
+        return True
+
+    def discard(self, day):
+        """Clear a completed day; returns False if it was not set."""
+        if day not in self:
+            return False
+        offset = to_ordinal(day) - self.epoch
+        self.bits[offset >> 3] &= ~(1 << (offset & 7)) & 0xFF
+        return True
+
+    def union(self, ordinals):
+        """New bitmap with every day ordinal in `ordinals` also set, built in one vectorised pass."""
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        if not len(ordinals):
+            return CompletionBitmap(self.epoch, self.bits)
+        days = np.concatenate([np.flatnonzero(self.to_array()) + self.epoch, ordinals])
+        epoch = int(days.min())
+        completed = np.zeros(int(days.max()) - epoch + 1, dtype=bool)
+        completed[days - epoch] = True
+        return CompletionBitmap.from_array(epoch, completed)
+
+    def to_array(self, end=None):
+        """Boolean array indexed by day offset from the epoch, up to and including `end`."""
+        completed = np.unpackbits(np.frombuffer(bytes(self.bits), dtype=np.uint8), bitorder='little').astype(bool)
+        if end is None:
+            return completed
+        length = max(to_ordinal(end) - self.epoch + 1, 0)
+        if length <= len(completed):
+            return completed[:length]
+        return np.concatenate([completed, np.zeros(length - len(completed), dtype=bool)])
+
+    def dates(self):
+        return [date.fromordinal(self.epoch + int(i)) for i in np.flatnonzero(self.to_array())]
+
+    def total(self):
+        return int.from_bytes(self.bits, 'little').bit_count()
+
+    def __repr__(self):
+        return f"CompletionBitmap(epoch={self.epoch_date.isoformat()}, total={self.total()})"
+
+
+# --- MULTI-HABIT VIEWS ---
+def completion_matrix(bitmaps, end):
+    """Habits x days matrix aligned on the earliest epoch, with a mask of the days each habit existed.
+
+    Returns (start_ordinal, completed, active).
+    """
+    start = min(b.epoch for b in bitmaps)
+    length = max(to_ordinal(end) - start + 1, 0)
+    completed = np.zeros((len(bitmaps), length), dtype=bool)
+    active = np.zeros((len(bitmaps), length), dtype=bool)
+    for i, bitmap in enumerate(bitmaps):
+        offset = bitmap.epoch - start
+        row = bitmap.to_array(end)
+        completed[i, offset:offset + len(row)] = row
+        active[i, offset:] = True
+    return start, completed, active
+
+
+def count_perfect_days(bitmaps, end):
+    # A day is perfect when every habit that existed on it was completed
+    if not bitmaps:
+        return 0
+    _, completed, active = completion_matrix(bitmaps, end)
+    return int(((completed | ~active).all(axis=0) & active.any(axis=0)).sum())
@@ -0,0 +1,63 @@
+import os
+import threading
+import time
+
+# Crockford base32: no I, L, O or U, and ASCII order matches numeric order
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+ID_LENGTH = 26
+RANDOM_BITS = 80
+
+
+# --- ID ALLOCATION ---
+class IdGenerator:
+    """ULID-style ids: 48-bit millisecond timestamp followed by 80 random bits, as 26 base32 chars.
+
+    Ids sort by creation time as plain strings. Within one millisecond the random part is
+    incremented, so ids from one process are strictly increasing; separate processes draw
+    independent random parts, so two of them colliding is a 1-in-2**80 event.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._last_ms = -1
+        self._last_random = 0
+
+    def _next(self):
+        # Caller holds the lock
+        now_ms = time.time_ns() // 1_000_000
+        if self._pid != os.getpid():
+            # A forked child must not continue its parent's sequence
+            self._pid = os.getpid()
+            self._last_ms = -1
+        if now_ms > self._last_ms:
+            self._last_ms = now_ms
+            self._last_random = int.from_bytes(os.urandom(RANDOM_BITS // 8), 'big')
+        else:
+            # Same millisecond (or the clock stepped back): keep counting from the last id
+            self._last_random += 1
+            if self._last_random >> RANDOM_BITS:
+                self._last_ms += 1
+                self._last_random = int.from_bytes(os.urandom(RANDOM_BITS // 8), 'big')
+        return encode((self._last_ms << RANDOM_BITS) | self._last_random)
+
+    def new_id(self):
+        with self._lock:
+            return self._next()
+
+    def new_ids(self, count):
+        with self._lock:
+            return [self._next() for _ in range(count)]
+
+
+def encode(value):
+    chars = []
+    for _ in range(ID_LENGTH):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+_generator = IdGenerator()
+new_id = _generator.new_id
+new_ids = _generator.new_ids
@@ -0,0 +1,47 @@
+import threading
+from bisect import bisect_left, insort
+
+
+# --- LEADERBOARD INDEX ---
+class LeaderboardIndex:
+    """XP ranking kept sorted as scores change.
+
+    Entries are (-xp, user_id) in a plain list, so ascending order is rank order and ties break
+    on id. Rank lookups bisect in O(log n); an update moves one entry, a memmove over the list.
+    """
+
+    def __init__(self, scores=()):
+        self._lock = threading.RLock()
+        self._xp = dict(scores)
+        self._ranked = sorted((-xp, user_id) for user_id, xp in self._xp.items())
+
+    def __len__(self):
+        return len(self._xp)
+
+    def update(self, user_id, xp):
+        with self._lock:
+            old = self._xp.get(user_id)
+            if old == xp:
+                return
+            if old is not None:
+                del self._ranked[bisect_left(self._ranked, (-old, user_id))]
+            self._xp[user_id] = xp
+            insort(self._ranked, (-xp, user_id))
+
+    def xp(self, user_id):
+        return self._xp.get(user_id)
+
+    def rank(self, user_id):
+        """1-based rank, or None for unknown users."""
+        with self._lock:
+            xp = self._xp.get(user_id)
+            if xp is None:
+                return None
+            return bisect_left(self._ranked, (-xp, user_id)) + 1
+
+    def page(self, start, count=50):
+        """(rank, user_id, xp) for ranks start+1 .. start+count."""
+        with self._lock:
+            start = max(start, 0)
+            return [(start + i + 1, user_id, -neg_xp)
+                    for i, (neg_xp, user_id) in enumerate(self._ranked[start:start + count])]
@@ -0,0 +1,16 @@
+import threading
+
+
+# --- LOCK STRIPING ---
+class LockStripes:
+    """A fixed pool of re-entrant locks shared out by key hash.
+
+    Work on one user only contends with the few users hashed to the same stripe, and the
+    pool stays the same size however many users the process has seen.
+    """
+
+    def __init__(self, stripes=64):
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def __call__(self, key):
+        return self._locks[hash(key) % len(self._locks)]
@@ -0,0 +1,129 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def frame_version(df, columns):
+    """Content hash of the columns a model is trained on; changes whenever the data does."""
+    if df.empty:
+        return 'empty'
+    row_hashes = pd.util.hash_pandas_object(df[list(columns)], index=False).values
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()[:16]
+
+
+# --- MODEL CACHE ---
+class ModelCache:
+    """LRU cache of fitted models keyed by (user, data version), bounded by total pickled size.
+
+    Every stored model is also written to disk with joblib so a restarted process can
+    reload it instead of retraining. Each user has their own directory holding only their
+    latest version, so looking a user up never lists anyone else's files.
+    latest() hands back the user's last model so a retrain can warm-start from it.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, cache_dir='.model_cache'):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _user_dir(self, user_id):
+        return os.path.join(self.cache_dir, user_id)
+
+    def _path(self, user_id, version):
+        return os.path.join(self._user_dir(user_id), f"{version}.joblib")
+
+    def get(self, user_id, version):
+        key = (user_id, version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+        if self.cache_dir and os.path.exists(self._path(user_id, version)):
+            # Imported on first disk access so app start does not pay for joblib
+            import joblib
+            try:
+                model = joblib.load(self._path(user_id, version))
+            except Exception:
+                return None
+            with self._lock:
+                self.disk_hits += 1
+            self._remember(key, model)
+            return model
+        return None
+
+    def contains(self, user_id, version):
+        """Whether a model for this data version is cached, without counting a hit or loading it."""
+        with self._lock:
+            if (user_id, version) in self._entries:
+                return True
+        return bool(self.cache_dir) and os.path.exists(self._path(user_id, version))
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def latest(self, user_id):
+        """(version, model) of the user's most recent model from memory or disk, or (None, None)."""
+        with self._lock:
+            for (owner, version), (model, _) in reversed(self._entries.items()):
+                if owner == user_id:
+                    return version, model
+        if self.cache_dir and os.path.isdir(self._user_dir(user_id)):
+            for name in os.listdir(self._user_dir(user_id)):
+                if name.endswith('.joblib'):
+                    version = name[:-len('.joblib')]
+                    import joblib
+                    try:
+                        return version, joblib.load(self._path(user_id, version))
+                    except Exception:
+                        break
+        return None, None
+
+    def put(self, user_id, version, model):
+        self._remember((user_id, version), model)
+        if self.cache_dir:
+            os.makedirs(self._user_dir(user_id), exist_ok=True)
+            for name in os.listdir(self._user_dir(user_id)):
+                if name != f"{version}.joblib":
+                    os.remove(os.path.join(self._user_dir(user_id), name))
+            import joblib
+            joblib.dump(model, self._path(user_id, version))
+
+    def _remember(self, key, model):
+        size = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            # A user only ever needs their newest model in memory
+            for old in [k for k in self._entries if k[0] == key[0] and k != key]:
+                self._bytes -= self._entries.pop(old)[1]
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (model, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
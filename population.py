@@ -0,0 +1,307 @@
+"""Population habit-success model: one forest trained in batch over every user's progress rows.
+
+    python population.py train [--workers N] [--output PATH]
+
+Users are split into shards, each shard grows its share of the trees in a worker process, and
+the shard forests are merged into a single forest. Per-user predictions add the user's own
+track record as a feature and a small per-user calibration offset, so users with only a few
+days of history (or none) get predictions from everyone else's data.
+"""
+import argparse
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from predictor import FEATURES, PERMUTATION_REPEATS
+
+# User-level features: how many habits the user tracks and their own track record
+GLOBAL_FEATURES = FEATURES + ['total_habits', 'user_rate']
+TREES = 200
+MIN_SHARD_TREES = 25
+# Users per shard below which a worker process costs more than it saves
+MIN_SHARD_USERS = 200
+# Pseudo-days pulling each user's calibration towards the population: small histories barely move it
+CALIBRATION_PRIOR_DAYS = 10
+IMPORTANCE_SAMPLE_ROWS = 20000
+MAX_LEAF_NODES = 512
+MAX_TREE_SAMPLES = 100000
+SUCCESS_RATE = 80
+
+
+def _logit(p):
+    p = np.clip(p, 1e-4, 1 - 1e-4)
+    return np.log(p / (1 - p))
+
+
+def _sigmoid(z):
+    return 1 / (1 + np.exp(-z))
+
+
+# --- TRAINING DATA ---
+def load_training_frame(storage, chunksize=100000):
+    """All users' progress rows with every feature, ordered by (user, date), with user_rate and the label."""
+    columns = ['user_id'] + FEATURES + ['total_habits', 'completion_rate']
+    chunks = [chunk[columns] for chunk in storage.export_chunks('progress', chunksize=chunksize)]
+    if not chunks:
+        return pd.DataFrame(columns=columns + ['user_rate', 'success'])
+    frame = pd.concat(chunks, ignore_index=True)
+    frame[FEATURES + ['total_habits']] = frame[FEATURES + ['total_habits']].astype(float)
+    frame['completion_rate'] = frame['completion_rate'].astype(float)
+
+    # Mean completion rate over the user's earlier days only, so a row never sees its own label
+    by_user = frame.groupby('user_id', sort=False)['completion_rate']
+    earlier_total = by_user.cumsum() - frame['completion_rate']
+    earlier_days = by_user.cumcount()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        frame['user_rate'] = (earlier_total / earlier_days).fillna(frame['completion_rate'].mean())
+    frame['success'] = (frame['completion_rate'] >= SUCCESS_RATE).astype(np.int8)
+    # Caught-up days count towards user_rate but have no mood or motivation to learn from
+    return frame.dropna(subset=FEATURES).reset_index(drop=True)
+
+
+def shard_ids(user_ids, shards):
+    """Stable shard per row's user (crc32, not hash(), so it is the same in every process)."""
+    codes, users = pd.factorize(user_ids)
+    return np.array([zlib.crc32(str(u).encode()) % shards for u in users], dtype=np.int64)[codes]
+
+
+def _fit_shard(X, y, n_estimators, seed):
+    # Runs in a worker process; one core per shard, the pool supplies the parallelism
+    from sklearn.ensemble import RandomForestClassifier
+
+    # Bounded trees and bootstrap samples keep the merged forest small however many rows there are
+    forest = RandomForestClassifier(
+        n_estimators=n_estimators, min_samples_leaf=5, max_leaf_nodes=MAX_LEAF_NODES, oob_score=True,
+        max_samples=min(1.0, MAX_TREE_SAMPLES / len(y)), random_state=seed, n_jobs=1
+    )
+    forest.fit(X, y)
+    # Out-of-bag probability of success per row: an honest score for calibrating this shard's users
+    oob = forest.oob_decision_function_[:, list(forest.classes_).index(1)]
+    return forest, oob
+
+
+def _merge(forests):
+    """One forest predicting with the trees of all the shard forests."""
+    merged = forests[0]
+    for forest in forests[1:]:
+        merged.estimators_ += forest.estimators_
+    merged.n_estimators = len(merged.estimators_)
+    merged.oob_score_ = None
+    merged.oob_decision_function_ = None
+    return merged
+
+
+# --- GLOBAL MODEL ---
+class GlobalModel:
+    """The merged forest with per-user calibration offsets (logit shifts)."""
+
+    def __init__(self, forest, calibration, base_rate, base_habits, rows, users, importances, trained_at):
+        self.forest = forest
+        self.calibration = calibration
+        self.base_rate = base_rate
+        self.base_habits = base_habits
+        self.rows = rows
+        self.users = users
+        self.permutation_importances_ = importances
+        self.trained_at = trained_at
+        self.version = f"global-{int(trained_at)}"
+
+    def for_user(self, user_id, progress_data, total_habits=None):
+        return UserModel(self, user_id, progress_data, total_habits)
+
+
+class UserModel:
+    """The global model seen from one user; quacks like the per-user forest where the app needs it."""
+
+    features_ = GLOBAL_FEATURES
+    classes_ = np.array([0, 1])
+
+    def __init__(self, model, user_id, progress_data, total_habits=None):
+        self.model = model
+        has_history = len(progress_data) > 0
+        self.user_rate = float(progress_data['completion_rate'].mean()) if has_history else model.base_rate
+        if total_habits is None:
+            total_habits = progress_data['total_habits'].iloc[-1] if has_history else model.base_habits
+        self.total_habits = float(total_habits)
+        self.offset = model.calibration.get(user_id, 0.0)
+        self.n_estimators = model.forest.n_estimators
+        self.training_rows_ = model.rows
+        self.permutation_importances_ = model.permutation_importances_
+        self.feature_importances_ = model.forest.feature_importances_
+
+    def predict_proba(self, X):
+        X = pd.DataFrame(X, columns=FEATURES).assign(total_habits=self.total_habits, user_rate=self.user_rate)
+        forest = self.model.forest
+        proba = forest.predict_proba(X[GLOBAL_FEATURES].to_numpy(dtype=np.float32))
+        classes = list(forest.classes_)
+        # A forest that only ever saw one class has a single probability column
+        success = proba[:, classes.index(1)] if 1 in classes else np.zeros(len(X))
+        if self.offset:
+            success = _sigmoid(_logit(success) + self.offset)
+        return np.column_stack([1 - success, success])
+
+
+def calibration_offsets(user_ids, y, oob):
+    """Per-user logit shift matching the user's success rate, shrunk towards zero for short histories."""
+    known = ~np.isnan(oob)
+    frame = pd.DataFrame({'user_id': user_ids[known], 'y': y[known], 'p': oob[known]})
+    sums = frame.groupby('user_id').agg(days=('y', 'size'), hits=('y', 'sum'), expected=('p', 'sum'))
+    predicted = sums['expected'] / sums['days']
+    # Observed rate with CALIBRATION_PRIOR_DAYS pseudo-days at the predicted rate
+    observed = (sums['hits'] + CALIBRATION_PRIOR_DAYS * predicted) / (sums['days'] + CALIBRATION_PRIOR_DAYS)
+    offsets = _logit(observed.to_numpy()) - _logit(predicted.to_numpy())
+    return dict(zip(sums.index, offsets.tolist()))
+
+
+def train_global(storage, workers=None, trees=TREES):
+    """Fit the population model over every user's progress; None if there are no rows.
+
+    Users are split into shards of at least MIN_SHARD_USERS; each shard fits its share of the
+    trees in its own process (spawned, since the app process is multi-threaded).
+    """
+    frame = load_training_frame(storage)
+    if frame.empty:
+        return None
+    workers = workers or os.cpu_count() or 1
+    n_users = frame['user_id'].nunique()
+    shards = max(1, min(workers, n_users // MIN_SHARD_USERS, trees // MIN_SHARD_TREES))
+
+    X = frame[GLOBAL_FEATURES].to_numpy(dtype=np.float32)
+    y = frame['success'].to_numpy()
+    user_ids = frame['user_id'].to_numpy()
+    shard = shard_ids(user_ids, shards)
+    parts = [np.flatnonzero(shard == s) for s in range(shards)]
+    # A shard that saw a single class would merge trees with mismatched outputs
+    parts = [rows for rows in parts if len(np.unique(y[rows])) == len(np.unique(y))] or [np.arange(len(y))]
+    per_shard = max(MIN_SHARD_TREES, trees // len(parts))
+
+    if len(parts) == 1:
+        results = [_fit_shard(X[parts[0]], y[parts[0]], per_shard, 0)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(parts)), mp_context=get_context('spawn')) as pool:
+            futures = [pool.submit(_fit_shard, X[rows], y[rows], per_shard, i) for i, rows in enumerate(parts)]
+            results = [f.result() for f in futures]
+
+    oob = np.full(len(y), np.nan)
+    for rows, (_, shard_oob) in zip(parts, results):
+        oob[rows] = shard_oob
+    forest = _merge([forest for forest, _ in results])
+
+    return GlobalModel(
+        forest=forest,
+        calibration=calibration_offsets(user_ids, y, oob),
+        base_rate=float(frame['completion_rate'].mean()),
+        base_habits=float(frame['total_habits'].median()),
+        rows=len(frame),
+        users=n_users,
+        importances=_importances(forest, X, y),
+        trained_at=time.time()
+    )
+
+
+def _importances(forest, X, y):
+    from joblib import parallel_config
+    from sklearn.inspection import permutation_importance
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(y), size=min(len(y), IMPORTANCE_SAMPLE_ROWS), replace=False)
+    with parallel_config(backend='threading'):
+        result = permutation_importance(
+            forest, X[sample], y[sample], n_repeats=PERMUTATION_REPEATS, random_state=0, n_jobs=-1
+        )
+    return result.importances_mean
+
+
+# --- SHARED HOLDER ---
+class PopulationModel:
+    """The process-wide global model, retrained in a background thread once it is max_age old.
+
+    The latest model is saved with joblib at `path`, so a restarted process (or one started
+    after `python population.py train`) picks it up without retraining.
+    """
+
+    def __init__(self, storage, path=None, max_age=6 * 3600, workers=None):
+        self.storage = storage
+        self.path = path
+        self.max_age = max_age
+        self.workers = workers
+        self.error = None
+        self._model = None
+        self._thread = None
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            import joblib
+            try:
+                self._model = joblib.load(path)
+            except Exception:
+                self._model = None
+
+    def get(self):
+        """The current model (possibly None), starting a background refresh if it is missing or stale."""
+        model = self._model
+        if model is None or time.time() - model.trained_at > self.max_age:
+            self.refresh()
+        return model
+
+    @property
+    def training(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def refresh(self, wait=False):
+        with self._lock:
+            if not self.training:
+                self._thread = threading.Thread(target=self._train, name='stridex-population', daemon=True)
+                self._thread.start()
+            thread = self._thread
+        if wait:
+            thread.join()
+
+    def _train(self):
+        try:
+            model = train_global(self.storage, self.workers)
+        except Exception as exc:
+            self.error = f"{type(exc).__name__}: {exc}"
+            return
+        self.error = None
+        if model is None:
+            return
+        if self.path:
+            import joblib
+            joblib.dump(model, self.path)
+        self._model = model
+
+
+def main():
+    from storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Train the population habit-success model.")
+    parser.add_argument('action', choices=('train',))
+    parser.add_argument('--workers', type=int, help='worker processes (default: all cores)')
+    parser.add_argument('--output', default=os.path.join(os.environ.get('STRIDEX_MODEL_CACHE_DIR', '.model_cache'),
+                                                         'population.joblib'))
+    args = parser.parse_args()
+
+    storage = open_storage()
+    try:
+        start = time.perf_counter()
+        model = train_global(storage, args.workers)
+    finally:
+        storage.close()
+    if model is None:
+        print("no progress rows to train on")
+        return
+    import joblib
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    joblib.dump(model, args.output)
+    print(f"trained on {model.rows} rows from {model.users} users with {model.forest.n_estimators} trees "
+          f"in {time.perf_counter() - start:.1f}s -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
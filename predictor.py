@@ -0,0 +1,108 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from model_cache import frame_version
+
+# --- HABIT PREDICTOR ---
+FEATURES = ['day_of_week', 'mood', 'motivation', 'habits_completed']
+FEATURE_LABELS = {
+    'day_of_week': 'Day of Week',
+    'mood': 'Mood',
+    'motivation': 'Motivation',
+    'habits_completed': 'Habits Completed',
+    'total_habits': 'Habits Tracked',
+    'user_rate': 'Your Track Record'
+}
+COLUMNS = FEATURES + ['completion_rate']
+
+MIN_DAYS = 10
+TREES = 100
+# Trees added when the history only grew; past MAX_TREES the forest is refit from scratch
+TREES_PER_UPDATE = 10
+MAX_TREES = 300
+PERMUTATION_REPEATS = 5
+
+
+def training_rows(df):
+    # Days filled in by catch-up have no mood or motivation check-in; as 0s they would teach the model noise
+    return df.dropna(subset=['mood', 'motivation']).reset_index(drop=True)
+
+
+def training_data(df):
+    X = df[FEATURES].fillna(0)
+    y = (df['completion_rate'] >= 80).astype(int)
+    return X, y
+
+
+def _extends(previous, df, y):
+    """True if `previous` was fit on a prefix of df and can take more trees for the new rows."""
+    rows = getattr(previous, 'training_rows_', None)
+    return (
+        rows is not None
+        and 0 < rows < len(df)
+        and previous.n_estimators + TREES_PER_UPDATE <= MAX_TREES
+        and set(np.unique(y)) == set(previous.classes_)
+        and frame_version(df.iloc[:rows], COLUMNS) == previous.training_version_
+    )
+
+
+def train(df, previous=None, n_jobs=-1):
+    """Random forest predicting 80%+ days, or None below MIN_DAYS of days with a mood check-in.
+
+    If `previous` (the user's last model) was trained on the start of this same history, the
+    new model is a copy of it with TREES_PER_UPDATE extra trees fit on the full data (sklearn's
+    warm_start) instead of a full refit. Trees are built on n_jobs cores (all by default).
+    """
+    df = training_rows(df)
+    if len(df) < MIN_DAYS:
+        return None
+
+    # scikit-learn takes longer to import than the rest of the app combined; only Predictions needs it
+    from sklearn.ensemble import RandomForestClassifier
+
+    X, y = training_data(df)
+    if previous is not None and _extends(previous, df, y):
+        # The cached model may be predicting in another session; grow a copy
+        model = copy.deepcopy(previous)
+        model.n_estimators += TREES_PER_UPDATE
+        model.n_jobs = n_jobs
+    else:
+        model = RandomForestClassifier(n_estimators=TREES, random_state=42, n_jobs=n_jobs, warm_start=True)
+    model.fit(X, y)
+
+    model.training_rows_ = len(df)
+    model.training_version_ = frame_version(df, COLUMNS)
+    model.permutation_importances_ = permutation_importances(model, X, y, n_jobs)
+    return model
+
+
+def permutation_importances(model, X, y, n_jobs=-1):
+    """Mean accuracy drop per feature when its column is shuffled, computed on n_jobs cores.
+
+    Stored on the model so it is cached, and persisted, with it.
+    """
+    from joblib import parallel_config
+    from sklearn.inspection import permutation_importance
+
+    # Threads: forest prediction releases the GIL, and worker processes would each need a copy of the model
+    with parallel_config(backend='threading'):
+        result = permutation_importance(
+            model, X, y, n_repeats=PERMUTATION_REPEATS, random_state=0, n_jobs=n_jobs
+        )
+    return result.importances_mean
+
+
+def importances(model):
+    """Share of importance per feature: permutation importance, or the forest's impurity importance
+    when shuffling no feature changes the predictions."""
+    features = getattr(model, 'features_', FEATURES)
+    values = np.clip(getattr(model, 'permutation_importances_', np.zeros(len(features))), 0, None)
+    if values.sum() <= 0:
+        values = model.feature_importances_
+    total = values.sum()
+    return pd.DataFrame({
+        'Feature': [FEATURE_LABELS[f] for f in features],
+        'Importance': values / total if total > 0 else values
+    })
@@ -0,0 +1,129 @@
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Values of STRIDEX_PROFILE / ?profile= that leave profiling off
+DISABLED = ('', '0', 'false', 'off', 'no')
+
+
+# --- DISABLED PROFILER ---
+class NullProfiler:
+    """Stand-in used when profiling is off: every call is a no-op returning a shared context."""
+
+    enabled = False
+    _context = nullcontext()
+
+    def span(self, name):
+        return self._context
+
+    def begin(self, name):
+        pass
+
+    def end(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+# --- RUN PROFILER ---
+class Profiler:
+    """Timing spans (and optionally cProfile stats) for one script run."""
+
+    enabled = True
+
+    def __init__(self, cprofile=False):
+        self.spans = []
+        self._open = []
+        self._origin = time.perf_counter_ns()
+        self._stopped = None
+        self._thread = threading.get_ident()
+        self.profile = None
+        if cprofile:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                self.profile = profile
+            except ValueError:
+                # Another session's cProfile already owns the interpreter's profiling hook
+                pass
+
+    @contextmanager
+    def span(self, name):
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end()
+
+    def begin(self, name):
+        self._open.append((name, time.perf_counter_ns()))
+
+    def end(self):
+        name, start = self._open.pop()
+        self.spans.append((name, start - self._origin, time.perf_counter_ns() - start, len(self._open)))
+
+    def stop(self):
+        if self._stopped is None:
+            self._stopped = time.perf_counter_ns()
+            if self.profile is not None:
+                self.profile.disable()
+
+    def elapsed_ms(self):
+        return ((self._stopped or time.perf_counter_ns()) - self._origin) / 1e6
+
+    def summary(self):
+        """Per-span call counts and total milliseconds, in start order and indented by nesting depth."""
+        rows = {}
+        for name, start, duration, depth in sorted(self.spans, key=lambda s: s[1]):
+            row = rows.setdefault(name, {'Span': '  ' * depth + name, 'Calls': 0, 'Total ms': 0.0})
+            row['Calls'] += 1
+            row['Total ms'] += duration / 1e6
+        return list(rows.values())
+
+    def chrome_trace(self):
+        """Spans as Chrome trace-event JSON (open in chrome://tracing or Perfetto)."""
+        pid = os.getpid()
+        events = [
+            {
+                'name': name,
+                'cat': 'stridex',
+                'ph': 'X',
+                'ts': start / 1000,
+                'dur': duration / 1000,
+                'pid': pid,
+                'tid': self._thread
+            }
+            for name, start, duration, _ in self.spans
+        ]
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})
+
+    def pstats_bytes(self):
+        """cProfile stats in the format pstats.Stats / snakeviz load from a .prof file."""
+        if self.profile is None:
+            return None
+        return marshal.dumps(pstats.Stats(self.profile).stats)
+
+    def top_functions(self, limit=15):
+        if self.profile is None:
+            return ''
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+
+def start_profiler(mode=None):
+    """Profiler for this run, from the ?profile= value or STRIDEX_PROFILE ("1" for spans, "cprofile" to add cProfile)."""
+    mode = (mode or os.environ.get('STRIDEX_PROFILE', '')).strip().lower()
+    if mode in DISABLED:
+        return NULL_PROFILER
+    return Profiler(cprofile=mode == 'cprofile')
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+from completions import completion_matrix
+from locks import LockStripes
+
+# Column dtypes; mood/motivation/focus are float so days without a check-in can hold NaN
+PROGRESS_DTYPES = {
+    'date': 'datetime64[ns]',
+    'completion_rate': np.float64,
+    'habits_completed': np.int64,
+    'total_habits': np.int64,
+    'xp_earned': np.int64,
+    'mood': np.float64,
+    'motivation': np.float64,
+    'focus_minutes': np.float64,
+    'day_of_week': np.int64,
+    'week_number': np.int64
+}
+
+
+# --- COLUMNAR PROGRESS ---
+class ProgressColumns:
+    """One user's daily progress as typed NumPy columns with geometric growth.
+
+    Appends are amortised O(1). frame() wraps the filled prefix of each column without
+    copying, and a running prefix sum of completion_rate answers any trailing-window mean in O(1).
+    """
+
+    def __init__(self, capacity=64):
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in PROGRESS_DTYPES.items()}
+        self._rate_sums = np.zeros(capacity + 1)
+        self._size = 0
+        self._frame = None
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._rate_sums) - 1
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+        sums = np.zeros(capacity + 1)
+        sums[:self._size + 1] = self._rate_sums[:self._size + 1]
+        self._rate_sums = sums
+
+    def extend(self, rows):
+        rows = pd.DataFrame(rows)
+        count = len(rows)
+        if not count:
+            return
+        self._reserve(count)
+        start, end = self._size, self._size + count
+        for name, dtype in PROGRESS_DTYPES.items():
+            self._columns[name][start:end] = rows[name].to_numpy(dtype=dtype)
+        self._rate_sums[start + 1:end + 1] = self._rate_sums[start] + np.cumsum(rows['completion_rate'].to_numpy(float))
+        self._size = end
+        self._frame = None
+
+    def append(self, row):
+        self.extend([row])
+
+    def last_date(self):
+        return pd.Timestamp(self._columns['date'][self._size - 1]) if self._size else None
+
+    def rolling_mean(self, window=7):
+        """Mean completion_rate over the last `window` days."""
+        if not self._size:
+            return float('nan')
+        window = min(window, self._size)
+        return float((self._rate_sums[self._size] - self._rate_sums[self._size - window]) / window)
+
+    def frame(self):
+        # Views over the filled prefix; later appends write past it so the frame stays valid
+        if self._frame is None:
+            self._frame = pd.DataFrame(
+                {name: column[:self._size] for name, column in self._columns.items()}, copy=False
+            )
+        return self._frame
+
+
+# --- PROGRESS STORE ---
+class ProgressStore:
+    """Process-wide cache of per-user ProgressColumns loaded from storage once and appended in place.
+
+    Loads and appends hold only the user's lock stripe, so one user's writer never blocks
+    sessions reading other users.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._users = {}
+        self._user_locks = LockStripes()
+
+    def columns(self, user_id):
+        columns = self._users.get(user_id)
+        if columns is None:
+            with self._user_locks(user_id):
+                columns = self._users.get(user_id)
+                if columns is None:
+                    columns = ProgressColumns()
+                    columns.extend(self.storage.get_progress(user_id))
+                    self._users[user_id] = columns
+        return columns
+
+    def frame(self, user_id):
+        with self._user_locks(user_id):
+            return self.columns(user_id).frame()
+
+    def append(self, user_id, rows):
+        with self._user_locks(user_id):
+            columns = self.columns(user_id)
+            self.storage.append_progress(user_id, rows)
+            columns.extend(rows)
+
+    def catch_up(self, user_id, habits, today):
+        """Append rows for finished days since the last recorded one, derived from the habit bitmaps.
+
+        Today is still in progress and is never stored: its row would freeze whatever was checked
+        at the first load. Returns the number of days appended.
+        """
+        with self._user_locks(user_id):
+            return self._catch_up(user_id, habits, today)
+
+    def _catch_up(self, user_id, habits, today):
+        # Runs under the user's stripe so two sessions of one user cannot append the same days
+        columns = self.columns(user_id)
+        last = columns.last_date()
+        if last is None or not habits:
+            return 0
+        yesterday = pd.Timestamp(today).normalize() - pd.Timedelta(days=1)
+        dates = pd.date_range(last.normalize() + pd.Timedelta(days=1), yesterday, freq='D')
+        if not len(dates):
+            return 0
+        start, matrix, _ = completion_matrix([h['completions'] for h in habits], today)
+        offsets = np.array([d.toordinal() for d in dates.date]) - start
+        completed = matrix[:, offsets].sum(axis=0)
+        self.append(user_id, pd.DataFrame({
+            'date': dates,
+            'completion_rate': completed / len(habits) * 100,
+            'habits_completed': completed,
+            'total_habits': len(habits),
+            'xp_earned': completed * 15,
+            'mood': np.nan,
+            'motivation': np.nan,
+            'focus_minutes': np.nan,
+            'day_of_week': dates.weekday,
+            'week_number': dates.isocalendar().week.to_numpy()
+        }))
+        return len(dates)
+
+    def forget(self, user_id):
+        with self._user_locks(user_id):
+            self._users.pop(user_id, None)
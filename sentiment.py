@@ -0,0 +1,197 @@
+"""Lexicon sentiment scoring for journal entries.
+
+    python sentiment.py rescore [--force]
+
+The whole lexicon is compiled into one regex (a prefix trie of the words) with word boundaries,
+so "good" no longer matches inside "goodbye" and an entry is scored in a single scan. A negator up to
+one word before a lexicon word ("not good", "wasn't very productive") flips its weight; that one word
+is never itself a lexicon word, so "not good good" negates only the first "good".
+"""
+import argparse
+import hashlib
+import re
+
+import numpy as np
+
+# Word -> weight; positive words count towards "Positive", negative words towards "Negative"
+LEXICON = {
+    # Positive
+    'good': 1.5, 'great': 2.0, 'happy': 2.0, 'happier': 2.0, 'productive': 2.0, 'productivity': 1.5,
+    'awesome': 2.5, 'focus': 1.0, 'focused': 1.5, 'energy': 1.0, 'energized': 2.0, 'energetic': 2.0,
+    'amazing': 2.5, 'excellent': 2.5, 'fantastic': 2.5, 'wonderful': 2.5, 'brilliant': 2.5, 'love': 2.0,
+    'loved': 2.0, 'loving': 2.0, 'enjoy': 1.5, 'enjoyed': 1.5, 'fun': 1.5, 'glad': 1.5, 'grateful': 2.0,
+    'thankful': 2.0, 'proud': 2.0, 'accomplished': 2.0, 'achieved': 2.0, 'success': 2.0, 'successful': 2.0,
+    'win': 1.5, 'won': 1.5, 'progress': 1.5, 'improved': 1.5, 'improving': 1.5, 'better': 1.0,
+    'best': 2.0, 'calm': 1.5, 'relaxed': 1.5, 'peaceful': 2.0, 'rested': 1.5, 'refreshed': 1.5,
+    'motivated': 2.0, 'inspired': 2.0, 'confident': 2.0, 'strong': 1.5, 'stronger': 1.5, 'healthy': 1.5,
+    'fit': 1.0, 'excited': 2.0, 'exciting': 2.0, 'joy': 2.5, 'joyful': 2.5, 'cheerful': 2.0,
+    'satisfied': 1.5, 'satisfying': 1.5, 'fulfilled': 2.0, 'optimistic': 2.0,
+    'hopeful': 1.5, 'positive': 1.5, 'nice': 1.0, 'lovely': 2.0, 'pleasant': 1.5, 'clear': 1.0,
+    'sharp': 1.0, 'efficient': 1.5, 'disciplined': 1.5, 'consistent': 1.5, 'crushed': 1.5,
+    'nailed': 2.0, 'smashed': 1.5, 'finished': 1.0, 'completed': 1.0, 'breakthrough': 2.5,
+    'flow': 1.5, 'balanced': 1.5, 'mindful': 1.5, 'centered': 1.5, 'blessed': 2.0, 'delighted': 2.5,
+    'thrilled': 2.5, 'ecstatic': 3.0, 'incredible': 2.5, 'perfect': 2.5, 'smooth': 1.0, 'easy': 1.0,
+    'easier': 1.0, 'helpful': 1.0, 'kind': 1.0, 'supported': 1.5, 'connected': 1.0, 'laughed': 1.5,
+    'smiled': 1.5, 'relieved': 1.5, 'resilient': 2.0, 'determined': 1.5, 'alive': 1.5, 'vibrant': 2.0,
+    # Negative
+    'bad': -1.5, 'worse': -2.0, 'worst': -2.5, 'sad': -2.0, 'unhappy': -2.0, 'tired': -1.5,
+    'exhausted': -2.5, 'drained': -2.0, 'stressed': -2.0, 'stress': -1.5, 'stressful': -2.0,
+    'anxious': -2.0, 'anxiety': -2.0, 'worried': -1.5, 'worry': -1.5, 'nervous': -1.5, 'angry': -2.0,
+    'annoyed': -1.5, 'frustrated': -2.0, 'frustrating': -2.0, 'upset': -2.0, 'depressed': -3.0,
+    'lonely': -2.0, 'bored': -1.0, 'boring': -1.0, 'lazy': -1.5, 'unproductive': -2.0,
+    'procrastinated': -1.5, 'procrastinating': -1.5, 'distracted': -1.5, 'overwhelmed': -2.5,
+    'burnout': -2.5, 'burned': -1.5, 'sick': -2.0, 'ill': -1.5, 'pain': -2.0, 'hurt': -2.0,
+    'sore': -1.0, 'awful': -2.5, 'terrible': -2.5, 'horrible': -2.5, 'miserable': -3.0, 'hate': -2.5,
+    'hated': -2.5, 'failed': -2.0, 'failure': -2.5, 'fail': -2.0, 'lost': -1.5, 'missed': -1.5,
+    'skipped': -1.0, 'struggled': -1.5, 'struggling': -2.0, 'struggle': -1.5, 'hard': -1.0,
+    'difficult': -1.0, 'tough': -1.0, 'slow': -1.0, 'sluggish': -1.5, 'weak': -1.5, 'guilty': -2.0,
+    'ashamed': -2.5, 'disappointed': -2.0, 'disappointing': -2.0, 'regret': -2.0, 'afraid': -2.0,
+    'scared': -2.0, 'panic': -2.5, 'restless': -1.5, 'sleepless': -1.5, 'insomnia': -2.0,
+    'irritated': -1.5, 'grumpy': -1.5, 'moody': -1.0, 'down': -1.0, 'low': -1.0, 'meh': -0.5,
+    'chaotic': -1.5, 'messy': -1.0, 'behind': -1.0, 'late': -1.0, 'broke': -1.5, 'broken': -1.5,
+    'unmotivated': -2.0, 'hopeless': -3.0, 'helpless': -2.5, 'pointless': -2.0, 'useless': -2.0,
+    'crappy': -2.0, 'rough': -1.5, 'cranky': -1.5, 'heartbroken': -3.0, 'cried': -2.0, 'crying': -2.0,
+}
+
+# "Not", "never" and any "...n't" contraction; may sit one word before the lexicon word
+NEGATORS = r"not|no|never|hardly|barely|without|cannot|\w+n['’]t"
+NEGATION_FACTOR = -0.75
+
+POSITIVE_THRESHOLD = 1.0
+NEGATIVE_THRESHOLD = -1.0
+
+
+def _trie_pattern(words):
+    """Regex for a set of words with shared prefixes factored out ("stress|stressed" -> "stress(?:ed)?").
+
+    A flat alternation makes the regex engine try every word at every position; the trie form
+    rejects a position after a character or two, which is several times faster on real text.
+    """
+    root = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # A word ending here makes the rest optional; the trailing \b rejects partial words
+        return f"(?:{body})?" if '' in node else body
+
+    return build(root)
+
+
+def _compile(lexicon):
+    words = _trie_pattern(lexicon)
+    # The word between a negator and its target must not be a lexicon word, or it would be skipped unscored
+    return re.compile(
+        rf"\b(?:(?P<negator>{NEGATORS})\s+(?:(?!(?:{words})\b)\w+\s+)?)?(?P<word>{words})\b", re.IGNORECASE
+    )
+
+
+# --- SCORER ---
+class SentimentScorer:
+    """Weighted-lexicon scorer: one compiled pattern, single-entry and vectorised batch scoring."""
+
+    def __init__(self, lexicon=None):
+        self.lexicon = {w.lower(): float(v) for w, v in (lexicon or LEXICON).items()}
+        self.pattern = _compile(self.lexicon)
+        # Changes whenever the words, weights or rules change; stored entries are rescored on mismatch
+        fingerprint = repr((sorted(self.lexicon.items()), self.pattern.pattern, NEGATION_FACTOR,
+                            POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD))
+        self.version = hashlib.sha1(fingerprint.encode()).hexdigest()[:12]
+
+    def score(self, text):
+        total = 0.0
+        for match in self.pattern.finditer(text or ''):
+            weight = self.lexicon[match.group('word').lower()]
+            total += weight * NEGATION_FACTOR if match.group('negator') else weight
+        return total
+
+    def score_many(self, texts):
+        """Scores for a sequence of texts as a float array.
+
+        The texts are joined with NUL separators (neither a word nor a space character, so no
+        match or negation spans two entries) and scanned once; each match is mapped back to its
+        entry by offset and the weights are summed with bincount.
+        """
+        texts = ['' if t is None or t != t else str(t) for t in texts]
+        if not texts:
+            return np.zeros(0)
+        ends = np.cumsum([len(t) + 1 for t in texts])
+        starts, weights = [], []
+        for match in self.pattern.finditer('\x00'.join(texts)):
+            weight = self.lexicon[match.group('word').lower()]
+            starts.append(match.start())
+            weights.append(weight * NEGATION_FACTOR if match.group('negator') else weight)
+        owners = np.searchsorted(ends, starts, side='right')
+        return np.bincount(owners, weights=weights, minlength=len(texts)).astype(float)
+
+    @staticmethod
+    def label(score):
+        if score >= POSITIVE_THRESHOLD:
+            return 'Positive'
+        if score <= NEGATIVE_THRESHOLD:
+            return 'Negative'
+        return 'Neutral'
+
+    def classify(self, text):
+        return self.label(self.score(text))
+
+    def classify_many(self, texts):
+        scores = self.score_many(texts)
+        return np.select(
+            [scores >= POSITIVE_THRESHOLD, scores <= NEGATIVE_THRESHOLD], ['Positive', 'Negative'], 'Neutral'
+        ).astype(object)
+
+
+DEFAULT_SCORER = SentimentScorer()
+classify = DEFAULT_SCORER.classify
+classify_many = DEFAULT_SCORER.classify_many
+
+
+# --- BATCH RESCORING ---
+LEXICON_META_KEY = 'sentiment_lexicon'
+
+
+def rescore_journal(storage, scorer=DEFAULT_SCORER, chunksize=10000):
+    """Re-label every stored journal entry with `scorer`; returns how many labels changed."""
+    changed = 0
+    for chunk in storage.export_chunks('journal', chunksize=chunksize):
+        labels = scorer.classify_many(chunk['text'])
+        differs = labels != chunk['sentiment'].to_numpy(dtype=object)
+        if differs.any():
+            changed += storage.set_sentiments(zip(labels[differs], chunk['entry_id'][differs].tolist()))
+    storage.set_meta(LEXICON_META_KEY, scorer.version)
+    return changed
+
+
+def rescore_if_stale(storage, scorer=DEFAULT_SCORER):
+    """Rescore stored entries if they were labelled by a different lexicon; returns labels changed."""
+    if storage.get_meta(LEXICON_META_KEY) == scorer.version:
+        return 0
+    return rescore_journal(storage, scorer)
+
+
+def main():
+    from storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Re-score stored journal entries with the current lexicon.")
+    parser.add_argument('action', choices=('rescore',))
+    parser.add_argument('--force', action='store_true', help='rescore even if the lexicon is unchanged')
+    args = parser.parse_args()
+
+    storage = open_storage()
+    try:
+        changed = rescore_journal(storage) if args.force else rescore_if_stale(storage)
+        print(f"{changed} journal entries relabelled (lexicon {DEFAULT_SCORER.version})")
+    finally:
+        storage.close()
+
+
+if __name__ == '__main__':
+    main()
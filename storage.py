@@ -0,0 +1,971 @@
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import date
+
+import pandas as pd
+
+import numpy as np
+
+from completions import UNIX_EPOCH_ORDINAL, CompletionBitmap, completion_matrix, to_ordinal
+from streaks import apply_check, bitmap_streaks, current
+
+# --- SCHEMA ---
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    level INTEGER NOT NULL DEFAULT 1,
+    xp INTEGER NOT NULL DEFAULT 0,
+    total_streak INTEGER NOT NULL DEFAULT 0,
+    rank TEXT NOT NULL DEFAULT 'Commander',
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_users_xp ON users (xp DESC);
+
+CREATE TABLE IF NOT EXISTS habits (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    emoji TEXT NOT NULL,
+    category TEXT NOT NULL,
+    streak INTEGER NOT NULL DEFAULT 0,
+    longest_streak INTEGER NOT NULL DEFAULT 0,
+    streak_end TEXT,
+    level INTEGER NOT NULL DEFAULT 1,
+    total_completions INTEGER NOT NULL DEFAULT 0,
+    epoch TEXT,
+    completions BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_habits_user ON habits (user_id, position);
+
+CREATE TABLE IF NOT EXISTS progress (
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    completion_rate REAL NOT NULL,
+    habits_completed INTEGER NOT NULL,
+    total_habits INTEGER NOT NULL,
+    xp_earned INTEGER NOT NULL,
+    mood INTEGER,
+    motivation INTEGER,
+    focus_minutes INTEGER,
+    day_of_week INTEGER NOT NULL,
+    week_number INTEGER NOT NULL,
+    PRIMARY KEY (user_id, date)
+) WITHOUT ROWID;
+
+-- Habits completed per user per day, kept in step with the habit bitmaps; days with none are absent
+CREATE TABLE IF NOT EXISTS daily_completions (
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    PRIMARY KEY (user_id, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    text TEXT NOT NULL,
+    sentiment TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_journal_user_date ON journal (user_id, date);
+
+CREATE TABLE IF NOT EXISTS achievements (
+    user_id TEXT NOT NULL,
+    achievement_id TEXT NOT NULL,
+    PRIMARY KEY (user_id, achievement_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+USER_FIELDS = ('id', 'username', 'level', 'xp', 'total_streak', 'rank')
+HABIT_FIELDS = ('id', 'name', 'emoji', 'category', 'streak', 'longest_streak', 'level', 'total_completions')
+HABIT_COLUMNS = ('id', 'user_id', 'position') + HABIT_FIELDS[1:] + ('streak_end', 'epoch', 'completions')
+PROGRESS_FIELDS = ('date', 'completion_rate', 'habits_completed', 'total_habits', 'xp_earned',
+                   'mood', 'motivation', 'focus_minutes', 'day_of_week', 'week_number')
+
+# Journal search: an FTS5 inverted index over journal text, kept in step with the journal
+# table by triggers. user_id is indexed too so a query intersects the user's posting list
+# instead of filtering every user's matches.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE journal_fts USING fts5(user_id, text, content='journal', content_rowid='id');
+CREATE TRIGGER journal_fts_insert AFTER INSERT ON journal BEGIN
+    INSERT INTO journal_fts (rowid, user_id, text) VALUES (new.id, new.user_id, new.text);
+END;
+CREATE TRIGGER journal_fts_delete AFTER DELETE ON journal BEGIN
+    INSERT INTO journal_fts (journal_fts, rowid, user_id, text) VALUES ('delete', old.id, old.user_id, old.text);
+END;
+CREATE TRIGGER journal_fts_update AFTER UPDATE OF user_id, text ON journal BEGIN
+    INSERT INTO journal_fts (journal_fts, rowid, user_id, text) VALUES ('delete', old.id, old.user_id, old.text);
+    INSERT INTO journal_fts (rowid, user_id, text) VALUES (new.id, new.user_id, new.text);
+END;
+INSERT INTO journal_fts (journal_fts) VALUES ('rebuild');
+"""
+
+# Highlight markers snippet() puts around matched terms; callers swap them for markup after escaping
+MATCH_START, MATCH_END = '\x02', '\x03'
+
+# Bulk export: SELECT, keyset columns in the table and the matching output columns
+EXPORTS = {
+    'habits': (
+        'SELECT user_id, id AS habit_id, position, name, emoji, category, streak, level, total_completions FROM habits',
+        ('id',), ('habit_id',)
+    ),
+    'checkins': ('SELECT user_id, id AS habit_id, epoch, completions FROM habits', ('id',), ('habit_id',)),
+    'progress': (
+        f"SELECT user_id, {', '.join(PROGRESS_FIELDS)} FROM progress", ('user_id', 'date'), ('user_id', 'date')
+    ),
+    'journal': ('SELECT id AS entry_id, user_id, date, text, sentiment FROM journal', ('id',), ('entry_id',)),
+}
+
+
+# --- STORAGE INTERFACE ---
+class Storage(ABC):
+    """Backend-neutral interface the app talks to. A backend missing any method cannot be instantiated."""
+
+    def __init__(self):
+        self._xp_listeners = []
+
+    def subscribe_xp(self, callback):
+        """Register callback(user_id, xp), called after every committed XP change."""
+        self._xp_listeners.append(callback)
+
+    def _notify_xp(self, user_id, xp):
+        for callback in self._xp_listeners:
+            callback(user_id, xp)
+
+    @abstractmethod
+    def create_user(self, user, habits, history):
+        ...
+
+    @abstractmethod
+    def get_user(self, user_id):
+        ...
+
+    @abstractmethod
+    def add_xp(self, user_id, amount):
+        ...
+
+    @abstractmethod
+    def get_habits(self, user_id):
+        ...
+
+    @abstractmethod
+    def add_habit(self, user_id, habit):
+        ...
+
+    @abstractmethod
+    def completed_on(self, user_id, day):
+        ...
+
+    @abstractmethod
+    def set_completion(self, user_id, habit_id, day, done, xp=15):
+        """Mark or unmark a habit for a day.
+
+        Returns False when nothing changed or the habit is not the user's, otherwise the habit's
+        current and longest streak and the user's total_streak after the change.
+        """
+
+    @abstractmethod
+    def recompute_streaks(self, user_id=None):
+        """Rebuild stored streaks from the check-ins for one user or everyone; returns habits updated."""
+
+    @abstractmethod
+    def daily_completions(self, user_id, start=None, end=None):
+        """(day ordinals, habits completed) arrays for the user's days with any completion,
+        optionally within [start, end] dates."""
+
+    @abstractmethod
+    def rebuild_daily_completions(self, user_id=None):
+        """Rebuild the per-day completion counts from the check-ins; returns users rebuilt."""
+
+    @abstractmethod
+    def get_progress(self, user_id):
+        ...
+
+    @abstractmethod
+    def append_progress(self, user_id, rows):
+        ...
+
+    @abstractmethod
+    def add_journal_entry(self, user_id, entry):
+        ...
+
+    @abstractmethod
+    def journal_count(self, user_id):
+        ...
+
+    @abstractmethod
+    def journal_page(self, user_id, before=None, limit=20, start=None, end=None):
+        """Entries newest first, optionally within [start, end] dates.
+
+        `before` is the (date, id) of the last entry of the previous page.
+        """
+
+    @abstractmethod
+    def search_journal(self, user_id, query, start=None, end=None, limit=20, offset=0):
+        """(total matches, best-ranked entries with a highlighted snippet) for a free-text query."""
+
+    @abstractmethod
+    def set_sentiments(self, pairs):
+        """Relabel journal entries from (sentiment, entry id) pairs; returns the number updated."""
+
+    @abstractmethod
+    def get_meta(self, key):
+        ...
+
+    @abstractmethod
+    def set_meta(self, key, value):
+        ...
+
+    @abstractmethod
+    def get_achievements(self, user_id):
+        ...
+
+    @abstractmethod
+    def unlock_achievements(self, user_id, achievement_ids):
+        ...
+
+    @abstractmethod
+    def unlock_many(self, pairs):
+        ...
+
+    @abstractmethod
+    def unlocked_by_user(self):
+        ...
+
+    @abstractmethod
+    def achievement_counters(self):
+        ...
+
+    @abstractmethod
+    def habit_bitmaps_by_user(self):
+        """{user_id: [CompletionBitmap in habit order]} for every user with habits, in one query."""
+
+    @abstractmethod
+    def get_users(self, user_ids):
+        ...
+
+    @abstractmethod
+    def habit_owners(self, habit_ids):
+        """{habit_id: user_id} for the habit ids that exist."""
+
+    @abstractmethod
+    def import_rows(self, dataset, frame):
+        """Write one validated import chunk (see transfer.DATASETS) in a single transaction."""
+
+    @abstractmethod
+    def export_chunks(self, dataset, user_id=None, chunksize=10000):
+        """Yield a dataset as DataFrames of at most `chunksize` source rows."""
+
+    @abstractmethod
+    def xp_scores(self):
+        ...
+
+    def close(self):
+        pass
+
+
+# --- SQLITE BACKEND ---
+class SQLiteStorage(Storage):
+    """SQLite backend in WAL mode with a fixed-size connection pool shared by all sessions."""
+
+    def __init__(self, path='stridex.db', pool_size=4):
+        super().__init__()
+        if path == ':memory:':
+            # A named shared-cache database lets every pooled connection see the same data
+            self.path = f"file:stridex-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        else:
+            self.path = path
+        self.pool_size = pool_size
+        self._pool = queue.Queue(maxsize=pool_size)
+        self._write_lock = threading.Lock()
+        self._xp_changes = []
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self._write_lock, self.connection() as conn:
+            has_rollup = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'daily_completions'").fetchone()
+            conn.executescript(SCHEMA)
+            stale_streaks = self._migrate(conn)
+            self.full_text_search = self._create_search_index(conn)
+        if stale_streaks:
+            self.recompute_streaks()
+        if not has_rollup:
+            self.rebuild_daily_completions()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            uri=self.path.startswith('file:'),
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=30
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _migrate(self, conn):
+        """Bring an older database up to SCHEMA; returns True if stored streaks must be recomputed."""
+        if 'version' not in {r[1] for r in conn.execute('PRAGMA table_info(users)')}:
+            conn.execute('ALTER TABLE users ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+        habit_columns = {r[1] for r in conn.execute('PRAGMA table_info(habits)')}
+        # Older databases kept one completions row per (habit, day) instead of a bitmap
+        if 'completions' not in habit_columns:
+            self._migrate_completions(conn)
+        if 'longest_streak' in habit_columns:
+            return False
+        # Streaks used to be a counter that only ever went up; they are rebuilt from the check-ins
+        conn.execute('ALTER TABLE habits ADD COLUMN longest_streak INTEGER NOT NULL DEFAULT 0')
+        conn.execute('ALTER TABLE habits ADD COLUMN streak_end TEXT')
+        return True
+
+    def _migrate_completions(self, conn):
+        conn.execute('ALTER TABLE completions RENAME TO legacy_completions')
+        conn.execute('ALTER TABLE habits ADD COLUMN epoch TEXT')
+        conn.execute('ALTER TABLE habits ADD COLUMN completions BLOB')
+        days_by_habit = {}
+        for habit_id, day in conn.execute('SELECT habit_id, day FROM legacy_completions'):
+            days_by_habit.setdefault(habit_id, []).append(day)
+        conn.executemany(
+            'UPDATE habits SET epoch = ?, completions = ? WHERE id = ?',
+            [(min(days), CompletionBitmap.from_dates(min(days), days).to_bytes(), habit_id)
+             for habit_id, days in days_by_habit.items()]
+        )
+        conn.execute('DROP TABLE legacy_completions')
+
+    def _create_search_index(self, conn):
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'journal_fts'").fetchone():
+            return True
+        try:
+            conn.executescript(f"BEGIN; {SEARCH_SCHEMA} COMMIT;")
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: search falls back to scanning the user's entries
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            return False
+        return True
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        # SQLite allows a single writer; serialising here avoids busy-retry storms
+        with self._write_lock, self.connection() as conn:
+            self._xp_changes = []
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+            # Still under the write lock, so listeners see XP changes in commit order
+            for user_id, xp in self._xp_changes:
+                self._notify_xp(user_id, xp)
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+    # Users
+    def create_user(self, user, habits, history):
+        # Streaks always come from the check-ins, whatever the habit records say
+        latest, ends, longest = bitmap_streaks([h['completions'] for h in habits])
+        rows = [
+            _habit_row(user['id'], i, h, (int(latest[i]), int(ends[i]), int(longest[i])))
+            for i, h in enumerate(habits)
+        ]
+        with self.transaction() as conn:
+            conn.execute(
+                'INSERT INTO users (id, username, level, xp, total_streak, rank) VALUES (?, ?, ?, ?, ?, ?)',
+                tuple({**user, 'total_streak': int(longest.max(initial=0))}[f] for f in USER_FIELDS)
+            )
+            conn.executemany(
+                f"INSERT INTO habits ({', '.join(HABIT_COLUMNS)}) VALUES ({', '.join('?' for _ in HABIT_COLUMNS)})",
+                rows
+            )
+            conn.executemany(
+                f"INSERT OR REPLACE INTO progress (user_id, {', '.join(PROGRESS_FIELDS)}) "
+                f"VALUES (?, {', '.join('?' for _ in PROGRESS_FIELDS)})",
+                ((user['id'],) + row for row in _progress_rows(history))
+            )
+            _add_daily(conn, user['id'], [h['completions'] for h in habits])
+            self._xp_changes.append((user['id'], user['xp']))
+        return user['id']
+
+    def get_user(self, user_id):
+        with self.connection() as conn:
+            row = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+        return dict(row) if row else None
+
+    def add_xp(self, user_id, amount):
+        with self.transaction() as conn:
+            rows = conn.execute(
+                'UPDATE users SET xp = MAX(0, xp + ?), version = version + 1 WHERE id = ? RETURNING xp',
+                (amount, user_id)
+            ).fetchall()
+            if rows:
+                self._xp_changes.append((user_id, rows[0][0]))
+
+    # Habits
+    def get_habits(self, user_id):
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(HABIT_FIELDS)}, streak_end, epoch, completions FROM habits "
+                f"WHERE user_id = ? ORDER BY position",
+                (user_id,)
+            ).fetchall()
+        today = date.today()
+        return [_habit_from_row(r, today) for r in rows]
+
+    def add_habit(self, user_id, habit):
+        with self.transaction() as conn:
+            position = conn.execute(
+                'SELECT COALESCE(MAX(position) + 1, 0) FROM habits WHERE user_id = ?', (user_id,)
+            ).fetchone()[0]
+            latest, ends, longest = bitmap_streaks([habit['completions']])
+            conn.execute(
+                f"INSERT INTO habits ({', '.join(HABIT_COLUMNS)}) VALUES ({', '.join('?' for _ in HABIT_COLUMNS)})",
+                _habit_row(user_id, position, habit, (int(latest[0]), int(ends[0]), int(longest[0])))
+            )
+            _add_daily(conn, user_id, [habit['completions']])
+            _refresh_total_streaks(conn, [user_id])
+            _touch(conn, user_id)
+
+    def recompute_streaks(self, user_id=None, chunksize=5000):
+        # Keyset pages over habits, each its own short transaction so sessions keep writing meanwhile
+        last, updated = '', 0
+        while True:
+            with self.transaction() as conn:
+                rows = conn.execute(
+                    'SELECT id, epoch, completions FROM habits WHERE id > ?'
+                    + (' AND user_id = ?' if user_id is not None else '') + ' ORDER BY id LIMIT ?',
+                    [last] + ([user_id] if user_id is not None else []) + [chunksize]
+                ).fetchall()
+                if not rows:
+                    break
+                _refresh_streaks(conn, rows)
+            updated += len(rows)
+            last = rows[-1]['id']
+        with self.transaction() as conn:
+            _refresh_total_streaks(conn, None if user_id is None else [user_id])
+            conn.execute(
+                'UPDATE users SET version = version + 1' + (' WHERE id = ?' if user_id is not None else ''),
+                [] if user_id is None else [user_id]
+            )
+        return updated
+
+    # Completions
+    def completed_on(self, user_id, day):
+        with self.connection() as conn:
+            rows = conn.execute(
+                'SELECT id, epoch, completions FROM habits WHERE user_id = ?', (user_id,)
+            ).fetchall()
+        return {r['id'] for r in rows if day in _bitmap(r)}
+
+    def set_completion(self, user_id, habit_id, day, done, xp=15):
+        with self.transaction() as conn:
+            row = conn.execute(
+                'SELECT epoch, completions, streak, streak_end, longest_streak FROM habits '
+                'WHERE id = ? AND user_id = ?',
+                (habit_id, user_id)
+            ).fetchone()
+            if row is None:
+                return False
+            bitmap = _bitmap(row)
+            changed = bitmap.add(day) if done else bitmap.discard(day)
+            if not changed:
+                return False
+            end = date.fromisoformat(row['streak_end']).toordinal() if row['streak_end'] else None
+            streak, end, longest = apply_check((row['streak'], end, row['longest_streak']), day, done, bitmap)
+            conn.execute(
+                'UPDATE habits SET epoch = ?, completions = ?, total_completions = MAX(0, total_completions + ?), '
+                'streak = ?, streak_end = ?, longest_streak = ? WHERE id = ?',
+                (bitmap.epoch_date.isoformat(), bitmap.to_bytes(), 1 if done else -1,
+                 streak, _iso(end), longest, habit_id)
+            )
+            _count_day(conn, user_id, _iso(to_ordinal(day)), 1 if done else -1)
+            if longest != row['longest_streak']:
+                _refresh_total_streaks(conn, [user_id])
+            rows = conn.execute(
+                'UPDATE users SET xp = MAX(0, xp + ?), version = version + 1 WHERE id = ? RETURNING xp, total_streak',
+                (xp if done else -xp, user_id)
+            ).fetchall()
+            if rows:
+                self._xp_changes.append((user_id, rows[0][0]))
+        return {
+            'streak': current(streak, end, date.today()),
+            'longest_streak': longest,
+            'total_streak': rows[0][1] if rows else longest
+        }
+
+    def daily_completions(self, user_id, start=None, end=None):
+        clauses, params = _date_range('date', start, end)
+        with self.connection() as conn:
+            rows = conn.execute(
+                'SELECT date, completed FROM daily_completions WHERE user_id = ?'
+                + ''.join(f" AND {c}" for c in clauses) + ' ORDER BY date',
+                [user_id] + params
+            ).fetchall()
+        days = np.array([r[0] for r in rows], dtype='datetime64[D]').astype(np.int64) + UNIX_EPOCH_ORDINAL
+        return days, np.array([r[1] for r in rows], dtype=np.int64)
+
+    def rebuild_daily_completions(self, user_id=None, chunksize=500):
+        # Keyset pages over users, like recompute_streaks; each page rebuilt from its habits' bitmaps
+        last, rebuilt = '', 0
+        while True:
+            with self.transaction() as conn:
+                user_ids = [r[0] for r in conn.execute(
+                    'SELECT id FROM users WHERE id > ?' + (' AND id = ?' if user_id is not None else '')
+                    + ' ORDER BY id LIMIT ?',
+                    [last] + ([user_id] if user_id is not None else []) + [chunksize]
+                )]
+                if not user_ids:
+                    break
+                _rebuild_daily(conn, user_ids)
+            rebuilt += len(user_ids)
+            last = user_ids[-1]
+        return rebuilt
+
+    # Progress
+    def get_progress(self, user_id):
+        with self.connection() as conn:
+            return pd.read_sql_query(
+                f"SELECT {', '.join(PROGRESS_FIELDS)} FROM progress WHERE user_id = ? ORDER BY date",
+                conn, params=(user_id,), parse_dates=['date']
+            )
+
+    def append_progress(self, user_id, rows):
+        with self.transaction() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO progress (user_id, {', '.join(PROGRESS_FIELDS)}) "
+                f"VALUES (?, {', '.join('?' for _ in PROGRESS_FIELDS)})",
+                ((user_id,) + row for row in _progress_rows(rows))
+            )
+            _touch(conn, user_id)
+
+    # Journal
+    def add_journal_entry(self, user_id, entry):
+        with self.transaction() as conn:
+            conn.execute(
+                'INSERT INTO journal (user_id, date, text, sentiment) VALUES (?, ?, ?, ?)',
+                (user_id, entry['date'], entry['text'], entry.get('sentiment'))
+            )
+            _touch(conn, user_id)
+
+    def journal_count(self, user_id):
+        with self.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM journal WHERE user_id = ?', (user_id,)).fetchone()[0]
+
+    def journal_page(self, user_id, before=None, limit=20, start=None, end=None):
+        # Keyset pagination on the (user_id, date) index: every page costs the same
+        clauses, params = _date_range('date', start, end)
+        if before is not None:
+            clauses.append('(date, id) < (?, ?)')
+            params.extend(before)
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"SELECT id, date, text, sentiment FROM journal WHERE user_id = ?"
+                f"{''.join(' AND ' + c for c in clauses)} ORDER BY date DESC, id DESC LIMIT ?",
+                [user_id] + params + [limit]
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def search_journal(self, user_id, query, start=None, end=None, limit=20, offset=0):
+        terms = _search_terms(query)
+        if not terms:
+            return 0, []
+        clauses, params = _date_range('j.date', start, end)
+        filters = ''.join(' AND ' + c for c in clauses)
+        with self.connection() as conn:
+            if not self.full_text_search:
+                return self._scan_journal(conn, user_id, terms, filters, params, limit, offset)
+            # Every term must match (the last as a prefix, for search-as-you-type) within the user's entries.
+            # The user_id column filter is a token match that only narrows the posting lists ('alice'
+            # also matches 'team-alice'); ownership is the equality check on the joined row.
+            words = ' '.join([_quote(t) for t in terms[:-1]] + [_quote(terms[-1]) + '*'])
+            match = f"user_id:{_quote(user_id)} AND text:({words})"
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM journal_fts JOIN journal j ON j.id = journal_fts.rowid "
+                f"WHERE journal_fts MATCH ? AND j.user_id = ?{filters}",
+                [match, user_id] + params
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT j.id, j.date, j.text, j.sentiment, bm25(journal_fts, 0.0, 1.0) AS score, "
+                f"snippet(journal_fts, 1, '{MATCH_START}', '{MATCH_END}', '…', 16) AS snippet "
+                f"FROM journal_fts JOIN journal j ON j.id = journal_fts.rowid "
+                f"WHERE journal_fts MATCH ? AND j.user_id = ?{filters} ORDER BY score LIMIT ? OFFSET ?",
+                [match, user_id] + params + [limit, offset]
+            ).fetchall()
+        return total, [dict(r) for r in rows]
+
+    def _scan_journal(self, conn, user_id, terms, filters, params, limit, offset):
+        where = f"j.user_id = ?{filters}" + ''.join(' AND instr(lower(j.text), ?) > 0' for _ in terms)
+        args = [user_id] + params + [t.lower() for t in terms]
+        total = conn.execute(f"SELECT COUNT(*) FROM journal j WHERE {where}", args).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT j.id, j.date, j.text, j.sentiment, NULL AS score, substr(j.text, 1, 120) AS snippet "
+            f"FROM journal j WHERE {where} ORDER BY j.date DESC, j.id DESC LIMIT ? OFFSET ?",
+            args + [limit, offset]
+        ).fetchall()
+        return total, [dict(r) for r in rows]
+
+    def set_sentiments(self, pairs):
+        pairs = list(pairs)
+        if not pairs:
+            return 0
+        # Sentiment is not an indexed column, so the search triggers do not fire
+        with self.transaction() as conn:
+            conn.executemany('UPDATE journal SET sentiment = ? WHERE id = ?', pairs)
+        return len(pairs)
+
+    # Settings
+    def get_meta(self, key):
+        with self.connection() as conn:
+            row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        with self.transaction() as conn:
+            conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    # Achievements
+    def get_achievements(self, user_id):
+        with self.connection() as conn:
+            rows = conn.execute(
+                'SELECT achievement_id FROM achievements WHERE user_id = ?', (user_id,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def unlock_achievements(self, user_id, achievement_ids):
+        if not achievement_ids:
+            return
+        with self.transaction() as conn:
+            conn.executemany(
+                'INSERT OR IGNORE INTO achievements (user_id, achievement_id) VALUES (?, ?)',
+                [(user_id, a) for a in achievement_ids]
+            )
+            _touch(conn, user_id)
+
+    def unlock_many(self, pairs):
+        pairs = list(pairs)
+        if not pairs:
+            return
+        with self.transaction() as conn:
+            conn.executemany('INSERT OR IGNORE INTO achievements (user_id, achievement_id) VALUES (?, ?)', pairs)
+            conn.executemany(
+                'UPDATE users SET version = version + 1 WHERE id = ?', [(u,) for u in {u for u, _ in pairs}]
+            )
+
+    def unlocked_by_user(self):
+        unlocked = {}
+        with self.connection() as conn:
+            for user_id, achievement_id in conn.execute('SELECT user_id, achievement_id FROM achievements'):
+                unlocked.setdefault(user_id, []).append(achievement_id)
+        return unlocked
+
+    def achievement_counters(self):
+        with self.connection() as conn:
+            return pd.read_sql_query(
+                'SELECT u.id AS user_id, u.xp, u.total_streak, u.level, '
+                '(SELECT COALESCE(SUM(h.total_completions), 0) FROM habits h WHERE h.user_id = u.id) AS completions, '
+                '(SELECT COUNT(*) FROM journal j WHERE j.user_id = u.id) AS journal_count '
+                'FROM users u',
+                conn
+            )
+
+    def habit_bitmaps_by_user(self):
+        bitmaps = {}
+        with self.connection() as conn:
+            for row in conn.execute('SELECT user_id, epoch, completions FROM habits ORDER BY user_id, position'):
+                bitmaps.setdefault(row['user_id'], []).append(_bitmap(row))
+        return bitmaps
+
+    # Leaderboard
+    def get_users(self, user_ids):
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        with self.connection() as conn:
+            rows = conn.execute(
+                'SELECT * FROM users WHERE id IN (SELECT value FROM json_each(?))', (json.dumps(user_ids),)
+            ).fetchall()
+        return {r['id']: dict(r) for r in rows}
+
+    def xp_scores(self):
+        with self.connection() as conn:
+            return [tuple(r) for r in conn.execute('SELECT id, xp FROM users')]
+
+    # Bulk import / export
+    def habit_owners(self, habit_ids):
+        with self.connection() as conn:
+            return dict(conn.execute(
+                'SELECT id, user_id FROM habits WHERE id IN (SELECT value FROM json_each(?))',
+                (json.dumps(list(habit_ids)),)
+            ))
+
+    def import_rows(self, dataset, frame):
+        user_ids = frame['user_id'].unique().tolist()
+        with self.transaction() as conn:
+            if dataset == 'habits':
+                next_position = dict(conn.execute(
+                    'SELECT user_id, MAX(position) + 1 FROM habits '
+                    'WHERE user_id IN (SELECT value FROM json_each(?)) GROUP BY user_id',
+                    (json.dumps(user_ids),)
+                ))
+                positions = frame['user_id'].map(next_position).fillna(0).astype(int) + frame.groupby('user_id').cumcount()
+                # Re-importing a habit refreshes its metadata but keeps its position and check-ins
+                conn.executemany(
+                    'INSERT INTO habits (id, user_id, position, name, emoji, category, streak, level, total_completions) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT(id) DO UPDATE SET name = excluded.name, emoji = excluded.emoji, '
+                    'category = excluded.category WHERE habits.user_id = excluded.user_id',
+                    zip(frame['habit_id'], frame['user_id'], positions.tolist(), frame['name'], frame['emoji'],
+                        frame['category'], frame['streak'].tolist(), frame['level'].tolist(),
+                        frame['total_completions'].tolist())
+                )
+            elif dataset == 'checkins':
+                ordinals = frame['date'].to_numpy(dtype='datetime64[D]').astype(np.int64) + UNIX_EPOCH_ORDINAL
+                days = {h: g.to_numpy() for h, g in pd.Series(ordinals).groupby(frame['habit_id'].to_numpy())}
+                rows = conn.execute(
+                    'SELECT id, epoch, completions FROM habits WHERE id IN (SELECT value FROM json_each(?))',
+                    (json.dumps(list(days)),)
+                ).fetchall()
+                updates = []
+                for row in rows:
+                    bitmap = _bitmap(row).union(days[row['id']])
+                    updates.append((bitmap.epoch_date.isoformat(), bitmap.to_bytes(), bitmap.total(), row['id']))
+                conn.executemany(
+                    'UPDATE habits SET epoch = ?, completions = ?, total_completions = ? WHERE id = ?', updates
+                )
+            elif dataset == 'progress':
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO progress (user_id, {', '.join(PROGRESS_FIELDS)}) "
+                    f"VALUES (?, {', '.join('?' for _ in PROGRESS_FIELDS)})",
+                    ((user_id,) + row for user_id, row in zip(frame['user_id'], _progress_rows(frame)))
+                )
+            elif dataset == 'journal':
+                entries = frame[['user_id', 'date', 'text', 'sentiment']].astype(object)
+                entries = entries.where(entries.notna(), None)
+                ids = frame['entry_id'] if 'entry_id' in frame.columns else pd.Series(np.nan, index=frame.index)
+                ids = [None if pd.isna(i) else int(i) for i in ids]
+                owners = dict(conn.execute(
+                    'SELECT id, user_id FROM journal WHERE id IN (SELECT value FROM json_each(?))',
+                    (json.dumps([i for i in ids if i is not None]),)
+                ))
+                # Re-importing an export updates its entries in place; an id held by another user's entry gets a new one
+                ids = [None if owners.get(i, user_id) != user_id else i for i, user_id in zip(ids, entries['user_id'])]
+                conn.executemany(
+                    'INSERT INTO journal (id, user_id, date, text, sentiment) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT(id) DO UPDATE SET date = excluded.date, text = excluded.text, '
+                    'sentiment = excluded.sentiment',
+                    ((i,) + row for i, row in zip(ids, entries.itertuples(index=False, name=None)))
+                )
+            else:
+                raise ValueError(f"Unknown dataset '{dataset}'")
+            if dataset in ('habits', 'checkins'):
+                # Streak columns in the file are ignored; they are derived from the stored check-ins
+                _refresh_streaks(conn, conn.execute(
+                    'SELECT id, epoch, completions FROM habits WHERE id IN (SELECT value FROM json_each(?))',
+                    (json.dumps(frame['habit_id'].unique().tolist()),)
+                ).fetchall())
+                _refresh_total_streaks(conn, user_ids)
+                _rebuild_daily(conn, user_ids)
+            for user_id in user_ids:
+                _touch(conn, user_id)
+        return len(frame)
+
+    def export_chunks(self, dataset, user_id=None, chunksize=10000):
+        # Keyset pagination: each chunk is its own short query, so no connection or
+        # cursor stays checked out while the caller writes the previous chunk
+        select, keys, key_columns = EXPORTS[dataset]
+        last = None
+        while True:
+            clauses, params = [], []
+            if user_id is not None:
+                clauses.append('user_id = ?')
+                params.append(user_id)
+            if last is not None:
+                clauses.append(f"({', '.join(keys)}) > ({', '.join('?' for _ in keys)})")
+                params.extend(last)
+            where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+            with self.connection() as conn:
+                chunk = pd.read_sql_query(
+                    f"{select}{where} ORDER BY {', '.join(keys)} LIMIT ?", conn, params=params + [chunksize]
+                )
+            if chunk.empty:
+                return
+            last = [chunk[c].iloc[-1] for c in key_columns]
+            yield _expand_checkins(chunk) if dataset == 'checkins' else chunk
+            if len(chunk) < chunksize:
+                return
+
+
+def _touch(conn, user_id):
+    # Every write bumps the user's data version so derived caches know to rebuild
+    conn.execute('UPDATE users SET version = version + 1 WHERE id = ?', (user_id,))
+
+
+def _habit_row(user_id, position, habit, streaks):
+    bitmap = habit['completions']
+    streak, end, longest = streaks
+    return (habit['id'], user_id, position, habit['name'], habit['emoji'], habit['category'],
+            streak, longest, habit['level'], habit['total_completions'],
+            _iso(end), bitmap.epoch_date.isoformat(), bitmap.to_bytes())
+
+
+def _iso(ordinal):
+    # Day ordinal (None or negative for "no day") as an ISO date for TEXT columns
+    return date.fromordinal(ordinal).isoformat() if ordinal is not None and ordinal > 0 else None
+
+
+def _refresh_streaks(conn, rows):
+    """Recompute streak columns for habit rows (id, epoch, completions) in one vectorised pass."""
+    latest, ends, longest = bitmap_streaks([_bitmap(r) for r in rows])
+    conn.executemany(
+        'UPDATE habits SET streak = ?, streak_end = ?, longest_streak = ? WHERE id = ?',
+        zip(latest.tolist(), [_iso(e) for e in ends.tolist()], longest.tolist(), [r['id'] for r in rows])
+    )
+
+
+def _refresh_total_streaks(conn, user_ids=None):
+    # A user's streak is the longest run any of their habits has reached; None refreshes every user
+    update = ('UPDATE users SET total_streak = '
+              '(SELECT COALESCE(MAX(longest_streak), 0) FROM habits h WHERE h.user_id = users.id)')
+    if user_ids is None:
+        conn.execute(update)
+    else:
+        conn.execute(f"{update} WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(list(user_ids)),))
+
+
+def _count_day(conn, user_id, day, delta):
+    conn.execute(
+        'INSERT INTO daily_completions (user_id, date, completed) VALUES (?, ?, ?) '
+        'ON CONFLICT (user_id, date) DO UPDATE SET completed = completed + excluded.completed',
+        (user_id, day, delta)
+    )
+    if delta < 0:
+        conn.execute('DELETE FROM daily_completions WHERE user_id = ? AND date = ? AND completed <= 0', (user_id, day))
+
+
+def _daily_rows(user_id, bitmaps):
+    # Per-day sums over the habits x days matrix; only days with a completion become rows
+    bitmaps = [b for b in bitmaps if b.bits]
+    if not bitmaps:
+        return []
+    start, completed, _ = completion_matrix(bitmaps, max(b.epoch + len(b.bits) * 8 for b in bitmaps))
+    counts = completed.sum(axis=0)
+    days = np.flatnonzero(counts)
+    dates = (days + start - UNIX_EPOCH_ORDINAL).astype('datetime64[D]').astype(str)
+    return [(user_id, d, c) for d, c in zip(dates.tolist(), counts[days].tolist())]
+
+
+def _add_daily(conn, user_id, bitmaps):
+    conn.executemany(
+        'INSERT INTO daily_completions (user_id, date, completed) VALUES (?, ?, ?) '
+        'ON CONFLICT (user_id, date) DO UPDATE SET completed = completed + excluded.completed',
+        _daily_rows(user_id, bitmaps)
+    )
+
+
+def _rebuild_daily(conn, user_ids):
+    conn.execute(
+        'DELETE FROM daily_completions WHERE user_id IN (SELECT value FROM json_each(?))', (json.dumps(user_ids),)
+    )
+    bitmaps = {user_id: [] for user_id in user_ids}
+    for row in conn.execute(
+        'SELECT user_id, epoch, completions FROM habits WHERE user_id IN (SELECT value FROM json_each(?))',
+        (json.dumps(user_ids),)
+    ):
+        bitmaps[row['user_id']].append(_bitmap(row))
+    for user_id, user_bitmaps in bitmaps.items():
+        _add_daily(conn, user_id, user_bitmaps)
+
+
+def _bitmap(row):
+    return CompletionBitmap(row['epoch'] or date.today(), row['completions'] or b'')
+
+
+def _habit_from_row(row, today):
+    habit = {f: row[f] for f in HABIT_FIELDS}
+    # Stored streak is the latest run; it only counts as current if it reaches yesterday or today
+    habit['streak'] = current(row['streak'], row['streak_end'], today)
+    habit['completions'] = _bitmap(row)
+    return habit
+
+
+def _expand_checkins(chunk):
+    # One (user_id, habit_id, date) row per set bit of each habit's bitmap
+    parts = []
+    for user_id, habit_id, epoch, bits in chunk.itertuples(index=False, name=None):
+        bitmap = _bitmap({'epoch': epoch, 'completions': bits})
+        days = np.flatnonzero(bitmap.to_array()) + (bitmap.epoch - UNIX_EPOCH_ORDINAL)
+        parts.append(pd.DataFrame({
+            'user_id': user_id,
+            'habit_id': habit_id,
+            'date': days.astype('datetime64[D]').astype(str)
+        }))
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=['user_id', 'habit_id', 'date'])
+
+
+def _search_terms(query):
+    return re.findall(r'\w+', query or '')
+
+
+def _quote(term):
+    # Quoted FTS5 strings are taken literally, so words like AND/NOT/NEAR stay plain terms
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _date_range(column, start, end):
+    # Dates are ISO strings; `end` is inclusive of the whole day
+    clauses, params = [], []
+    if start is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(str(start))
+    if end is not None:
+        clauses.append(f"{column} < ?")
+        params.append((pd.Timestamp(end) + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+    return clauses, params
+
+
+def _progress_rows(history):
+    # Accepts a list of per-day dicts or a DataFrame; yields plain Python tuples for sqlite3
+    frame = pd.DataFrame(history, columns=list(PROGRESS_FIELDS))
+    frame['date'] = pd.to_datetime(frame['date']).dt.strftime('%Y-%m-%d')
+    return frame.astype(object).itertuples(index=False, name=None)
+
+
+# --- BACKEND REGISTRY ---
+BACKENDS = {
+    'sqlite': SQLiteStorage,
+}
+
+
+def open_storage(backend=None, **options):
+    backend = backend or os.environ.get('STRIDEX_STORAGE', 'sqlite')
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{backend}'. Available: {', '.join(BACKENDS)}")
+    if backend == 'sqlite' and 'path' not in options:
+        options['path'] = os.environ.get('STRIDEX_DB', 'stridex.db')
+    return BACKENDS[backend](**options)
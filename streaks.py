@@ -0,0 +1,95 @@
+"""Habit streaks derived from completion history.
+
+    python streaks.py recompute [--user ID]
+
+Each habit stores three numbers: the length of its latest run of completed days, the last day
+of that run, and its longest run. They do not depend on today's date, so they only change on
+check-ins; the current streak is read from them (see current). Check-ins at the end of the
+latest run update them in O(1); anything else (back-dated check-ins, unchecking inside a run)
+recomputes that one habit, and a batch pass rebuilds them for every habit at once.
+"""
+import argparse
+
+import numpy as np
+
+from completions import completion_matrix, to_ordinal
+
+
+# --- RUN-LENGTH ENGINE ---
+def run_lengths(completed):
+    """Length of the run of completed days ending on each day of a habits x days matrix (0 on misses)."""
+    days = np.arange(1, completed.shape[1] + 1)
+    last_miss = np.maximum.accumulate(np.where(completed, 0, days), axis=1)
+    return days - last_miss
+
+
+def matrix_streaks(completed, start):
+    """(latest run length, ordinal of its last day or -1, longest run) per row; column 0 is day `start`."""
+    n, length = completed.shape
+    if length == 0:
+        return np.zeros(n, dtype=np.int64), np.full(n, -1, dtype=np.int64), np.zeros(n, dtype=np.int64)
+    runs = run_lengths(completed)
+    has_any = completed.any(axis=1)
+    last = length - 1 - np.argmax(completed[:, ::-1], axis=1)
+    latest = np.where(has_any, runs[np.arange(n), last], 0)
+    ends = np.where(has_any, start + last, -1)
+    return latest, ends, runs.max(axis=1)
+
+
+def bitmap_streaks(bitmaps):
+    """matrix_streaks for CompletionBitmaps, aligned on a shared day axis; returns three arrays."""
+    if not bitmaps:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    # Far enough to cover every set bit of every bitmap
+    end = max(b.epoch + len(b.bits) * 8 for b in bitmaps)
+    start, completed, _ = completion_matrix(bitmaps, end)
+    return matrix_streaks(completed, start)
+
+
+def current(streak, streak_end, today):
+    """Current streak on `today`: today is still in progress, so a run ending yesterday is alive."""
+    if streak_end is None or to_ordinal(streak_end) < to_ordinal(today) - 1:
+        return 0
+    return streak
+
+
+# --- INCREMENTAL UPDATES ---
+def apply_check(state, day, done, bitmap):
+    """New (streak, streak_end ordinal or None, longest) after `day` was checked or unchecked.
+
+    `bitmap` must already include the change. Checking the day after the latest run (the daily
+    check-in) and unchecking the latest run's last day are O(1); other edits recompute from the
+    bitmap.
+    """
+    streak, end, longest = state
+    day = to_ordinal(day)
+    if done and (end is None or day > end):
+        # Extends the latest run, or starts a new one after a gap
+        streak = streak + 1 if end is not None and day == end + 1 else 1
+        return streak, day, max(longest, streak)
+    if not done and end is not None and day == end and streak > 1 and streak < longest:
+        # The latest run shrinks by a day; the longest run is another one and is unaffected
+        return streak - 1, day - 1, longest
+    latest, ends, longests = bitmap_streaks([bitmap])
+    return int(latest[0]), (int(ends[0]) if ends[0] >= 0 else None), int(longests[0])
+
+
+def main():
+    from storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Recompute stored habit streaks from completion history.")
+    parser.add_argument('action', choices=('recompute',))
+    parser.add_argument('--user', help='only this user (default: every user)')
+    args = parser.parse_args()
+
+    storage = open_storage()
+    try:
+        habits = storage.recompute_streaks(args.user)
+        print(f"recomputed streaks for {habits} habits")
+    finally:
+        storage.close()
+
+
+if __name__ == '__main__':
+    main()
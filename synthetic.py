@@ -0,0 +1,94 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from completions import CompletionBitmap
+from ids import new_ids
+from streaks import current, matrix_streaks
+
+CATEGORIES = ['Health', 'Intellect', 'Spirit', 'Career', 'Creativity']
+EMOJIS = ['💪', '📚', '🧘', '💻', '🎯', '🏃', '🎨', '🔥']
+XP_PER_HABIT = 15
+
+
+def synthetic_habit_names(count):
+    return [f"Protocol {i + 1}" for i in range(count)]
+
+
+# --- SYNTHETIC HISTORY ---
+def generate_history(habit_names, days=60, seed=None, end=None):
+    """Draws a full days x habits completion matrix in one call and derives every column from it.
+
+    Returns (habits, history, stats): habit records in the habits_db schema, a progress_db-shaped
+    DataFrame, and the user's resulting 'xp' and 'total_streak'. History covers the `days` finished
+    days before `end`; the end day itself is left unchecked and has no progress row.
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or datetime.now())
+    dates = pd.date_range(end=end.normalize() - pd.Timedelta(days=1), periods=days, freq='D')
+    n_habits = len(habit_names)
+
+    weekday = dates.weekday.to_numpy()
+    base_rate = np.where(weekday >= 5, 0.6, 0.75)
+    completed = rng.random((days, n_habits)) < base_rate[:, None]
+
+    habit_totals = completed.sum(axis=0)
+    latest, run_ends, longest = matrix_streaks(completed.T, dates[0].toordinal() if days else 0)
+
+    habits = [{
+        'id': habit_id,
+        'name': name,
+        'emoji': emoji,
+        'category': category,
+        'streak': current(int(run), int(run_end), end),
+        'longest_streak': int(best),
+        'level': 1,
+        'total_completions': int(total),
+        'completions': CompletionBitmap.from_array(dates[0], completed[:, i])
+    } for i, (habit_id, name, emoji, category, total, run, run_end, best) in enumerate(zip(
+        new_ids(n_habits),
+        habit_names,
+        rng.choice(EMOJIS, n_habits),
+        rng.choice(CATEGORIES, n_habits),
+        habit_totals,
+        latest,
+        run_ends,
+        longest
+    ))]
+
+    completed_count = completed.sum(axis=1)
+    xp = completed_count * XP_PER_HABIT
+
+    history = pd.DataFrame({
+        'date': dates,
+        'completion_rate': completed_count / max(n_habits, 1) * 100,
+        'habits_completed': completed_count,
+        'total_habits': n_habits,
+        'xp_earned': xp,
+        'mood': rng.integers(5, 11, days),
+        'motivation': rng.integers(4, 10, days),
+        'focus_minutes': rng.integers(30, 181, days),
+        'day_of_week': weekday,
+        'week_number': dates.isocalendar().week.to_numpy()
+    })
+
+    stats = {
+        'xp': int(xp.sum()),
+        'total_streak': int(longest.max(initial=0))
+    }
+    return habits, history, stats
+
+
+def seed_user(storage, user_id, username, habit_names, days=60, seed=None, end=None):
+    """Generate a history and store the user, habits and history in a single create_user transaction."""
+    habits, history, stats = generate_history(habit_names, days=days, seed=seed, end=end)
+    storage.create_user({
+        'id': user_id,
+        'username': username,
+        'level': int(stats['xp'] / 500) + 1,
+        'xp': stats['xp'],
+        'total_streak': stats['total_streak'],
+        'rank': 'Commander'
+    }, habits, history)
+    return user_id
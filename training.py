@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from model_cache import frame_version
+
+READY, TRAINING, FAILED, NO_DATA = 'ready', 'training', 'failed', 'no_data'
+
+
+# --- BACKGROUND TRAINING ---
+class TrainingQueue:
+    """Trains models off the request path on a small worker pool, at most one job per user.
+
+    request() never blocks on a fit: it returns the cached model for the current data if there
+    is one, and otherwise queues training and hands back the user's last good model meanwhile.
+    If the data changes again while a user's job runs, only the newest version is trained next.
+    """
+
+    def __init__(self, cache, train_fn, max_workers=2):
+        self.cache = cache
+        self.train_fn = train_fn
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='stridex-train')
+        self._lock = threading.Lock()
+        self._running = {}   # user_id -> version being trained
+        self._pending = {}   # user_id -> (version, df) to train once the running job finishes
+        self._failed = {}    # (user_id, version) -> error message
+        self.completed = 0
+
+    def request(self, user_id, df, columns):
+        """(model, version the model was trained on, status) for the user's current data."""
+        version = frame_version(df, columns)
+        model = self.cache.get(user_id, version)
+        if model is not None:
+            return model, version, READY
+        with self._lock:
+            if (user_id, version) in self._failed:
+                status = FAILED
+            else:
+                status = TRAINING
+                # A miss is counted once per version queued, not on every rerun while it trains
+                if user_id not in self._running:
+                    self.cache.record_miss()
+                    self._start(user_id, version, df)
+                elif self._running[user_id] != version and self._pending.get(user_id, (None,))[0] != version:
+                    self.cache.record_miss()
+                    self._pending[user_id] = (version, df)
+        last_version, last_model = self.cache.latest(user_id)
+        return last_model, last_version, status
+
+    def status(self, user_id, version):
+        with self._lock:
+            if (user_id, version) in self._failed:
+                return FAILED
+            queued = self._pending.get(user_id)
+            if self._running.get(user_id) == version or (queued and queued[0] == version):
+                return TRAINING
+        # Polled every few seconds while training; a membership check keeps the cache's hit count honest
+        return READY if self.cache.contains(user_id, version) else NO_DATA
+
+    def error(self, user_id, version):
+        with self._lock:
+            return self._failed.get((user_id, version))
+
+    def _start(self, user_id, version, df):
+        # Caller holds the lock
+        self._running[user_id] = version
+        self._executor.submit(self._train, user_id, version, df)
+
+    def _train(self, user_id, version, df):
+        try:
+            _, previous = self.cache.latest(user_id)
+            model = self.train_fn(df, previous)
+            if model is not None:
+                self.cache.put(user_id, version, model)
+        except Exception as exc:
+            with self._lock:
+                self._failed[(user_id, version)] = f"{type(exc).__name__}: {exc}"
+        finally:
+            with self._lock:
+                del self._running[user_id]
+                self.completed += 1
+                if user_id in self._pending:
+                    self._start(user_id, *self._pending.pop(user_id))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'jobs': len(self._running),
+                'pending': len(self._pending),
+                'completed': self.completed,
+                'failed': len(self._failed),
+                'max_workers': self.max_workers
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,247 @@
+"""Streaming CSV/Parquet import and export of habits, check-ins, progress and journal data.
+
+    python transfer.py import progress history.csv [--user ID]
+    python transfer.py export checkins warehouse/checkins.parquet [--user ID]
+
+Storage comes from STRIDEX_STORAGE / STRIDEX_DB, as in the app.
+"""
+import argparse
+import json
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from sentiment import classify_many
+
+CHUNK_ROWS = 50000
+
+# Per dataset: export columns and dtypes, columns an import must provide, and defaults for the rest
+DATASETS = {
+    'habits': {
+        'columns': {'user_id': str, 'habit_id': str, 'position': 'int64', 'name': str, 'emoji': str,
+                    'category': str, 'streak': 'int64', 'level': 'int64', 'total_completions': 'int64'},
+        'required': ('user_id', 'habit_id', 'name'),
+        'defaults': {'emoji': '🎯', 'category': 'Imported', 'streak': 0, 'level': 1, 'total_completions': 0}
+    },
+    'checkins': {
+        'columns': {'user_id': str, 'habit_id': str, 'date': str},
+        'required': ('user_id', 'habit_id', 'date'),
+        'defaults': {}
+    },
+    'progress': {
+        'columns': {'user_id': str, 'date': str, 'completion_rate': 'float64', 'habits_completed': 'int64',
+                    'total_habits': 'int64', 'xp_earned': 'int64', 'mood': 'float64', 'motivation': 'float64',
+                    'focus_minutes': 'float64', 'day_of_week': 'int64', 'week_number': 'int64'},
+        'required': ('user_id', 'date', 'completion_rate', 'habits_completed', 'total_habits'),
+        'defaults': {'mood': np.nan, 'motivation': np.nan, 'focus_minutes': np.nan}
+    },
+    'journal': {
+        'columns': {'entry_id': 'int64', 'user_id': str, 'date': str, 'text': str, 'sentiment': str},
+        'required': ('user_id', 'date', 'text'),
+        'defaults': {'sentiment': None}
+    }
+}
+
+FORMATS = ('csv', 'parquet')
+
+
+def detect_format(target):
+    name = str(getattr(target, 'name', target)).lower()
+    return 'parquet' if name.endswith(('.parquet', '.pq')) else 'csv'
+
+
+def _parquet():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet import/export needs pyarrow: pip install pyarrow") from None
+    return pa, pq
+
+
+# --- IMPORT ---
+def read_chunks(source, fmt=None, chunksize=CHUNK_ROWS):
+    """Yield DataFrames of at most `chunksize` rows from a CSV or Parquet path or file object."""
+    fmt = fmt or detect_format(source)
+    if fmt == 'parquet':
+        _, pq = _parquet()
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunksize, dtype=str, keep_default_na=False, na_values=[''])
+
+
+def validate(dataset, chunk, storage, user_id=None):
+    """Coerce a raw chunk to the dataset's columns and split off invalid rows.
+
+    Returns (valid rows, {reason: rejected row count}). Every check runs over whole columns.
+    """
+    spec = DATASETS[dataset]
+    frame = chunk.copy()
+    if user_id is not None:
+        frame['user_id'] = user_id
+    missing = [c for c in spec['required'] if c not in frame.columns]
+    if missing:
+        raise ValueError(f"{dataset} import is missing column(s): {', '.join(missing)}")
+    for column, default in spec['defaults'].items():
+        if column not in frame.columns:
+            frame[column] = default
+
+    problems = {}
+    invalid = pd.Series(False, index=frame.index)
+
+    def reject(mask, reason):
+        nonlocal invalid
+        mask = mask & ~invalid
+        if mask.any():
+            problems[reason] = problems.get(reason, 0) + int(mask.sum())
+            invalid |= mask
+
+    for column in ('user_id', 'habit_id', 'name', 'text'):
+        if column in frame.columns and column in spec['required']:
+            frame[column] = frame[column].astype('string').str.strip()
+            reject(frame[column].isna() | (frame[column] == ''), f"empty {column}")
+
+    known_users = storage.get_users(frame.loc[~invalid, 'user_id'].unique().tolist())
+    reject(~frame['user_id'].isin(list(known_users)), "unknown user_id")
+
+    if 'date' in frame.columns:
+        parsed = pd.to_datetime(frame['date'], errors='coerce', format='mixed')
+        reject(parsed.isna(), "unparseable date")
+        frame['date'] = parsed
+
+    if dataset in ('habits', 'checkins'):
+        owners = pd.Series(storage.habit_owners(frame.loc[~invalid, 'habit_id'].unique().tolist()), dtype=object)
+        owner = frame['habit_id'].map(owners)
+        if dataset == 'habits':
+            reject(owner.notna() & (owner != frame['user_id']), "habit_id belongs to another user")
+            reject(frame['habit_id'].duplicated(keep='last'), "duplicate habit_id")
+        else:
+            reject(owner.isna(), "unknown habit_id")
+            reject(owner != frame['user_id'], "habit_id belongs to another user")
+
+    # Columns that must hold a value: required ones and those with a non-missing default
+    mandatory = set(spec['required']) | {c for c, v in spec['defaults'].items() if pd.notna(v)}
+    numeric = [c for c, dtype in spec['columns'].items() if dtype != str and c in frame.columns]
+    for column in numeric:
+        frame[column] = pd.to_numeric(frame[column], errors='coerce')
+        if column in mandatory:
+            reject(frame[column].isna(), f"non-numeric {column}")
+
+    if dataset == 'progress':
+        reject(~frame['completion_rate'].between(0, 100), "completion_rate outside 0-100")
+        reject((frame['habits_completed'] < 0) | (frame['habits_completed'] > frame['total_habits']),
+               "habits_completed outside 0-total_habits")
+        for column in ('mood', 'motivation'):
+            reject(frame[column].notna() & ~frame[column].between(1, 10), f"{column} outside 1-10")
+
+    frame = frame[~invalid].copy()
+    for column in numeric:
+        if spec['columns'][column] == 'int64' and column in mandatory:
+            frame[column] = frame[column].astype('int64')
+    if dataset == 'progress':
+        # Derived columns are recomputed rather than trusted
+        frame['date'] = frame['date'].dt.normalize()
+        frame['day_of_week'] = frame['date'].dt.weekday
+        frame['week_number'] = frame['date'].dt.isocalendar().week.astype('int64')
+        if 'xp_earned' not in chunk.columns:
+            frame['xp_earned'] = frame['habits_completed'] * 15
+        frame['xp_earned'] = frame['xp_earned'].fillna(frame['habits_completed'] * 15)
+    elif dataset == 'journal':
+        frame['date'] = frame['date'].dt.strftime('%Y-%m-%dT%H:%M:%S')
+        # Entries without a label get one from the lexicon, in one pass over the chunk
+        unlabelled = frame['sentiment'].isna().to_numpy()
+        if unlabelled.any():
+            frame['sentiment'] = frame['sentiment'].astype(object)
+            frame.loc[unlabelled, 'sentiment'] = classify_many(frame.loc[unlabelled, 'text'])
+    return frame, problems
+
+
+def import_file(storage, dataset, source, fmt=None, user_id=None, chunksize=CHUNK_ROWS):
+    """Stream a file into storage chunk by chunk, one transaction per valid chunk.
+
+    With user_id, every row is imported for that user whatever the file says. Returns a report
+    of rows read, imported and rejected, with rejection counts by reason.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}'. Available: {', '.join(DATASETS)}")
+    report = {'rows': 0, 'imported': 0, 'rejected': 0, 'problems': {}}
+    for chunk in read_chunks(source, fmt, chunksize):
+        valid, problems = validate(dataset, chunk, storage, user_id)
+        report['rows'] += len(chunk)
+        report['rejected'] += len(chunk) - len(valid)
+        for reason, count in problems.items():
+            report['problems'][reason] = report['problems'].get(reason, 0) + count
+        if len(valid):
+            report['imported'] += storage.import_rows(dataset, valid)
+    return report
+
+
+# --- EXPORT ---
+def export_frames(storage, dataset, user_id=None, chunksize=CHUNK_ROWS):
+    """Yield a dataset as typed DataFrames straight from storage, one chunk at a time."""
+    columns = DATASETS[dataset]['columns']
+    for chunk in storage.export_chunks(dataset, user_id, chunksize):
+        yield chunk[list(columns)].astype(columns)
+
+
+def iter_csv(storage, dataset, user_id=None, chunksize=CHUNK_ROWS):
+    """Yield a dataset as CSV text, header first, one chunk at a time."""
+    yield ','.join(DATASETS[dataset]['columns']) + '\n'
+    for frame in export_frames(storage, dataset, user_id, chunksize):
+        yield frame.to_csv(index=False, header=False)
+
+
+def export_file(storage, dataset, target, fmt=None, user_id=None, chunksize=CHUNK_ROWS):
+    """Write a dataset to a CSV or Parquet path or file object; returns the number of rows written."""
+    fmt = fmt or detect_format(target)
+    rows = 0
+    if fmt == 'parquet':
+        pa, pq = _parquet()
+        writer = None
+        try:
+            for frame in export_frames(storage, dataset, user_id, chunksize):
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(target, table.schema)
+                writer.write_table(table.cast(writer.schema))
+                rows += len(frame)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+    # A caller-owned file object is written to but left open
+    with open(target, 'w', newline='', encoding='utf-8') if isinstance(target, str) else nullcontext(target) as out:
+        out.write(','.join(DATASETS[dataset]['columns']) + '\n')
+        for frame in export_frames(storage, dataset, user_id, chunksize):
+            out.write(frame.to_csv(index=False, header=False))
+            rows += len(frame)
+    return rows
+
+
+def main():
+    from storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Import or export StrideX data as CSV or Parquet.")
+    parser.add_argument('action', choices=('import', 'export'))
+    parser.add_argument('dataset', choices=list(DATASETS))
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=FORMATS, help='defaults to the file extension')
+    parser.add_argument('--user', help='limit an export to, or force an import into, one user id')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    storage = open_storage()
+    try:
+        if args.action == 'import':
+            print(json.dumps(import_file(storage, args.dataset, args.path, args.format, args.user, args.chunksize), indent=2))
+        else:
+            rows = export_file(storage, args.dataset, args.path, args.format, args.user, args.chunksize)
+            print(f"exported {rows} {args.dataset} rows to {args.path}")
+    finally:
+        storage.close()
+
+
+if __name__ == '__main__':
+    main()